@@ -1,12 +1,18 @@
 """Telegram Bot 處理器"""
 
+import asyncio
 import hashlib
 import logging
 import re
-from typing import Optional
+import time
+from collections import OrderedDict
+from functools import cached_property
+from typing import Awaitable, Callable, Optional
 
+from sqlalchemy import func, select
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import (
+    AIORateLimiter,
     Application,
     CallbackQueryHandler,
     CommandHandler,
@@ -41,31 +47,140 @@ from app.database.models import (
 )
 from telegram.error import TelegramError, TimedOut, NetworkError
 
+try:
+    # google-re2：線性時間 DFA 比對，不會災難性回溯（可選依賴）
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
 
 logger = logging.getLogger(__name__)
 
 
+_UNAUTHORIZED_MESSAGE = "⛔ 您沒有使用此 Bot 的權限。"
+
+_SINGLE_FLIGHT_FAILED_MESSAGE = "❌ 處理失敗，請重新分享此連結再試一次。"
+
+_INVALID_URL_MESSAGE = (
+    "❓ 請分享有效的連結。\n"
+    "支援格式：\n"
+    "• instagram.com/reel/xxx\n"
+    "• instagram.com/p/xxx\n"
+    "• threads.net/@user/post/xxx"
+)
+
+_WELCOME_MESSAGE = """👋 歡迎使用社群內容摘要 Bot！
+
+📱 使用方式：
+直接分享連結給我，我會自動幫你：
+1. 下載影片/貼文/串文
+2. 轉錄語音（影片）/ 分析圖片 / 整理文字
+3. 生成摘要與重點
+4. 同步到 Roam Research
+
+⚡ 指令：
+/start - 顯示此說明
+/status - 查看系統狀態
+
+🔗 支援的連結格式：
+📸 Instagram
+• instagram.com/reel/xxx（影片 Reels）
+• instagram.com/reels/xxx（影片 Reels）
+• instagram.com/p/xxx（貼文/圖片/輪播圖）
+
+🧵 Threads
+• threads.net/@user/post/xxx
+• threads.net/t/xxx
+
+開始使用吧！✨"""
+
+_STATUS_TEMPLATE = """📊 系統狀態
+
+✅ Bot 運作正常
+⏳ 待重試任務：{pending_count} 個
+⏰ 重試間隔：每 {retry_interval_hours} 小時
+🔄 最大重試次數：{max_retry_count} 次"""
+
+
+_INSTAGRAM_URL_REGEX = r"https?://(?:www\.)?instagram\.com/(?:reels?|p)/[A-Za-z0-9_-]+"
+
+_THREADS_URL_REGEX = (
+    r"https?://(?:www\.)?threads\.(?:net|com)/(?:@[\w.]+/post|t|share)/[A-Za-z0-9_-]+"
+)
+
+
+def _compile_url_pattern(pattern: str):
+    """編譯純 ASCII 的 URL 正則：優先使用 re2，未安裝時以 re.ASCII 編譯"""
+    if _re2 is not None:
+        return _re2.compile(pattern)
+    return re.compile(pattern, re.ASCII)
+
+
+class _ReplyRecorder:
+    """代理 processing_message，記錄最後一次編輯的文字"""
+
+    def __init__(self, message):
+        self._message = message
+        self.last_text: Optional[str] = None
+
+    def __getattr__(self, name):
+        return getattr(self._message, name)
+
+    async def edit_text(self, text: str, *args, **kwargs):
+        self.last_text = text
+        if self._message is not None:
+            return await self._message.edit_text(text, *args, **kwargs)
+
+
+def _bullet_list(items: list[str]) -> str:
+    """將項目組成「• 」開頭的多行列表（單次 join，不逐項建立 f-string）"""
+    return "• " + "\n• ".join(items) if items else ""
+
+
+async def _skip() -> None:
+    """asyncio.gather 中略過的步驟佔位"""
+    return None
+
+
 class TelegramBotHandler:
     """Telegram Bot 訊息處理器"""
 
-    # Instagram URL 正則表達式
-    INSTAGRAM_URL_PATTERN = re.compile(
-        r"https?://(?:www\.)?instagram\.com/(?:reel|p|reels)/([A-Za-z0-9_-]+)"
-    )
-
     # Threads URL 正則表達式（支援 threads.net 和 threads.com）
     # 含 /share/<code> 分享短連結（下載器會跟隨轉址取得正規貼文 URL）
-    THREADS_URL_PATTERN = re.compile(
-        r"https?://(?:www\.)?threads\.(?:net|com)/(?:@[\w.]+/post|t|share)/([A-Za-z0-9_-]+)"
+    THREADS_URL_PATTERN = _compile_url_pattern(_THREADS_URL_REGEX)
+
+    # Instagram / Threads 合併正則：一次掃描同時找出兩種連結
+    # （有安裝 google-re2 時使用 re2，否則退回標準 re）
+    URL_PATTERN = _compile_url_pattern(
+        f"(?P<threads>{_THREADS_URL_REGEX})|(?P<instagram>{_INSTAGRAM_URL_REGEX})"
     )
 
+    # 記憶體中保留的已處理訊息 ID 數量上限
+    MAX_PROCESSED_MESSAGE_IDS = 1000
+
+    # 失敗任務背景寫入時，單次 commit 最多合併的筆數
+    FAILED_TASK_BATCH_SIZE = 32
+    # 失敗任務背景寫入時，等待更多任務合併的最長秒數
+    FAILED_TASK_FLUSH_INTERVAL = 0.2
+
+    # /status 待重試數量快取秒數
+    STATUS_CACHE_TTL = 5.0
+
+    # 同一聊天室進度更新的最小間隔，未滿即略過（最終回覆不受限；
+    # 速率限制與 429 重試由 AIORateLimiter 處理）
+    EDIT_MIN_INTERVAL = 1.0
+
+    # 全域每秒送出的 Bot API 請求上限（低於 Telegram 的 30 則/秒，保留餘裕）
+    OUTBOUND_MAX_RATE = 25
+    # 被 Telegram 限流（RetryAfter）時的重試次數
+    OUTBOUND_MAX_RETRIES = 2
+
+    # Threads 串文中同時進行視覺分析的影片數量上限
+    THREADS_VIDEO_CONCURRENCY = 2
+
     def __init__(self):
         self.downloader = InstagramDownloader()
         self.threads_downloader = ThreadsDownloader()
-        self.transcriber = WhisperTranscriber()
-        self.summarizer = get_summarizer()
-        self.roam_sync = RoamSyncService()
-        self.visual_analyzer = VideoVisualAnalyzer()
         self.download_logger = DownloadLogger()
         self.notebooklm_sync: Optional[NotebookLMSyncService] = (
             NotebookLMSyncService() if settings.notebooklm_enabled else None
@@ -74,20 +189,77 @@ class TelegramBotHandler:
             VaultSyncService() if settings.vault_sync_enabled else None
         )
         self.application: Optional[Application] = None
-        # 用於防止重複處理同一訊息
-        self._processed_message_ids: set[int] = set()
+        # 用於防止重複處理同一訊息：(chat_id, message_id)
+        self._processed_message_ids: OrderedDict[tuple[int, int], None] = OrderedDict()
         # 用於暫存待確認的筆記
         self._pending_notes: dict = {}
         # 用於 reprocess callback_data 的 URL 映射（避免超過 Telegram 64-byte 限制）
         self._reprocess_urls: dict[str, str] = {}
+        # 失敗任務背景寫入佇列（由 _drain_failed_tasks 批次寫入資料庫）
+        self._failed_queue: asyncio.Queue[FailedTask] = asyncio.Queue()
+        self._failed_writer: Optional[asyncio.Task] = None
+        # /status 待重試數量快取：(查詢時間, 數量)
+        self._status_cache: Optional[tuple[float, int]] = None
+        self._status_lock = asyncio.Lock()
+        # 各聊天室最近一次編輯訊息的時間（依更新順序排列，過期即移除）
+        self._last_edit_at: OrderedDict[int, float] = OrderedDict()
+        # 背景工作（暫存檔清理等）
+        self._background_tasks: set[asyncio.Task] = set()
+        # 處理中的 URL → 完成時的最終回覆文字（single-flight）
+        self._inflight_urls: dict[str, asyncio.Future] = {}
+
+    # 較重的服務延遲到第一次使用時才建立（/start、/status 等指令用不到）
+
+    @cached_property
+    def transcriber(self) -> WhisperTranscriber:
+        """語音轉錄服務"""
+        return WhisperTranscriber()
+
+    @cached_property
+    def summarizer(self):
+        """摘要服務（依 SUMMARIZER_BACKEND 選擇，可能需要檢查 CLI 是否可用）"""
+        return get_summarizer()
+
+    @cached_property
+    def roam_sync(self) -> RoamSyncService:
+        """筆記儲存服務"""
+        return RoamSyncService()
+
+    @cached_property
+    def visual_analyzer(self) -> VideoVisualAnalyzer:
+        """視覺分析服務"""
+        return VideoVisualAnalyzer()
 
     def _is_authorized(self, chat_id: str) -> bool:
-        """檢查使用者是否有權限使用 Bot"""
-        allowed_ids = settings.allowed_chat_ids
-        if not allowed_ids:
-            # 如果沒有設定，允許所有使用者
-            return True
-        return str(chat_id) in allowed_ids
+        """檢查使用者是否有權限使用 Bot（chat_id 需已轉為字串）"""
+        allowed_ids = settings.allowed_chat_id_set
+        # 如果沒有設定，允許所有使用者
+        return not allowed_ids or chat_id in allowed_ids
+
+    def _record_edit(self, message) -> None:
+        """記錄聊天室最近一次編輯時間，供進度更新判斷是否略過"""
+        chat_key = getattr(message, "chat_id", None)
+        if chat_key is None:
+            return
+        now = time.monotonic()
+        self._last_edit_at[chat_key] = now
+        self._last_edit_at.move_to_end(chat_key)
+        # 移除間隔已過的聊天室（對之後的進度更新已無影響），避免字典無限成長
+        while self._last_edit_at:
+            oldest_key, oldest_at = next(iter(self._last_edit_at.items()))
+            if now - oldest_at < self.EDIT_MIN_INTERVAL:
+                break
+            del self._last_edit_at[oldest_key]
+
+    async def _update_progress(self, message, text: str) -> bool:
+        """更新處理進度：距上次編輯未滿 EDIT_MIN_INTERVAL 時直接略過，不等待"""
+        chat_key = getattr(message, "chat_id", None)
+        if chat_key is not None:
+            last_edit_at = self._last_edit_at.get(chat_key)
+            if last_edit_at is not None and time.monotonic() - last_edit_at < self.EDIT_MIN_INTERVAL:
+                logger.debug("略過進度更新（編輯過於頻繁）: %s", text)
+                return False
+        return await self._safe_edit_message(message, text)
 
     async def _safe_edit_message(self, message, text: str) -> bool:
         """安全地編輯訊息，處理網路超時等錯誤
@@ -102,6 +274,7 @@ class TelegramBotHandler:
         if message is None:
             logger.debug("訊息物件為 None，跳過編輯")
             return False
+        self._record_edit(message)
         try:
             await message.edit_text(text)
             return True
@@ -112,19 +285,29 @@ class TelegramBotHandler:
             logger.warning(f"編輯訊息失敗: {e}")
             return False
 
-    def _extract_instagram_url(self, text: str) -> Optional[str]:
-        """從訊息中提取 Instagram URL"""
-        match = self.INSTAGRAM_URL_PATTERN.search(text)
-        if match:
-            return match.group(0)
-        return None
+    def _extract_url(self, text: str) -> tuple[Optional[str], Optional[str]]:
+        """從訊息中提取連結
 
-    def _extract_threads_url(self, text: str) -> Optional[str]:
-        """從訊息中提取 Threads URL"""
-        match = self.THREADS_URL_PATTERN.search(text)
-        if match:
-            return match.group(0)
-        return None
+        Threads 連結（需啟用）優先於 Instagram 連結。
+
+        Returns:
+            (平台, URL)：平台為 "threads" 或 "instagram"；找不到時為 (None, None)
+        """
+        # 快速路徑：不含網域字串的訊息不需要跑正則
+        if "instagram.com/" not in text and "threads." not in text:
+            return None, None
+
+        instagram_url = None
+        for match in self.URL_PATTERN.finditer(text):
+            threads_url = match.group("threads")
+            if threads_url:
+                if settings.threads_enabled:
+                    return "threads", threads_url
+            elif instagram_url is None:
+                instagram_url = match.group("instagram")
+        if instagram_url:
+            return "instagram", instagram_url
+        return None, None
 
     def _is_reel_url(self, url: str) -> bool:
         """判斷 URL 是否為 Reel（影片）"""
@@ -137,18 +320,76 @@ class TelegramBotHandler:
         error_type: ErrorType,
         error_message: str,
     ) -> None:
-        """儲存失敗的任務到資料庫"""
-        async with AsyncSessionLocal() as session:
-            task = FailedTask(
-                instagram_url=instagram_url,
-                telegram_chat_id=chat_id,
-                error_type=error_type.value,
-                error_message=error_message,
-                status=TaskStatus.PENDING.value,
-            )
-            session.add(task)
-            await session.commit()
-            logger.info(f"已記錄失敗任務: {instagram_url}")
+        """將失敗的任務排入背景寫入佇列（不阻塞使用者回覆）"""
+        task = FailedTask(
+            instagram_url=instagram_url,
+            telegram_chat_id=chat_id,
+            error_type=error_type.value,
+            error_message=error_message,
+            status=TaskStatus.PENDING.value,
+        )
+        self._failed_queue.put_nowait(task)
+        if self._failed_writer is None or self._failed_writer.done():
+            self._failed_writer = asyncio.create_task(self._drain_failed_tasks())
+
+    async def _drain_failed_tasks(self) -> None:
+        """背景寫入失敗任務：每批合併為一次 commit"""
+        while True:
+            batch = [await self._failed_queue.get()]
+            # 第一筆進來後最多再等 FAILED_TASK_FLUSH_INTERVAL 秒，收集同一波失敗一起寫入
+            deadline = time.monotonic() + self.FAILED_TASK_FLUSH_INTERVAL
+            while len(batch) < self.FAILED_TASK_BATCH_SIZE:
+                if not self._failed_queue.empty():
+                    batch.append(self._failed_queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._failed_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                async with AsyncSessionLocal() as session:
+                    session.add_all(batch)
+                    await session.commit()
+                # 待重試數量已改變，讓 /status 重新查詢
+                self._status_cache = None
+                for task in batch:
+                    logger.info(f"已記錄失敗任務: {task.instagram_url}")
+            except Exception as e:
+                logger.error(f"寫入失敗任務失敗（{len(batch)} 筆）: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._failed_queue.task_done()
+
+    def _log_download(self, log_func: Callable[..., object], **kwargs) -> None:
+        """在背景執行緒寫入下載記錄（JSON/CSV 檔案 I/O 不佔用處理流程）"""
+        self._run_in_background(asyncio.to_thread(log_func, **kwargs))
+
+    def _run_in_background(self, coro: Awaitable[None]) -> None:
+        """在背景執行不影響回覆的工作（保留參照避免 task 被回收）"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+
+    def _on_background_task_done(self, task: asyncio.Task) -> None:
+        """背景工作結束：移除參照並記錄錯誤"""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"背景工作失敗: {task.exception()}")
+
+    async def shutdown(self) -> None:
+        """等待背景工作與失敗任務寫入完成，並停止寫入任務"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._failed_writer is None:
+            return
+        if not self._failed_writer.done():
+            await self._failed_queue.join()
+        self._failed_writer.cancel()
+        self._failed_writer = None
 
     async def start_command(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -157,35 +398,10 @@ class TelegramBotHandler:
         chat_id = str(update.effective_chat.id)
 
         if not self._is_authorized(chat_id):
-            await update.message.reply_text("⛔ 您沒有使用此 Bot 的權限。")
+            await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
             return
 
-        welcome_message = """👋 歡迎使用社群內容摘要 Bot！
-
-📱 使用方式：
-直接分享連結給我，我會自動幫你：
-1. 下載影片/貼文/串文
-2. 轉錄語音（影片）/ 分析圖片 / 整理文字
-3. 生成摘要與重點
-4. 同步到 Roam Research
-
-⚡ 指令：
-/start - 顯示此說明
-/status - 查看系統狀態
-
-🔗 支援的連結格式：
-📸 Instagram
-• instagram.com/reel/xxx（影片 Reels）
-• instagram.com/reels/xxx（影片 Reels）
-• instagram.com/p/xxx（貼文/圖片/輪播圖）
-
-🧵 Threads
-• threads.net/@user/post/xxx
-• threads.net/t/xxx
-
-開始使用吧！✨"""
-
-        await update.message.reply_text(welcome_message)
+        await update.message.reply_text(_WELCOME_MESSAGE)
 
     async def status_command(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -194,90 +410,97 @@ class TelegramBotHandler:
         chat_id = str(update.effective_chat.id)
 
         if not self._is_authorized(chat_id):
-            await update.message.reply_text("⛔ 您沒有使用此 Bot 的權限。")
+            await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
             return
 
-        # 查詢待處理的失敗任務數量
-        async with AsyncSessionLocal() as session:
-            from sqlalchemy import select, func
+        pending_count = await self._get_pending_count()
 
-            result = await session.execute(
-                select(func.count(FailedTask.id)).where(
-                    FailedTask.status == TaskStatus.PENDING.value
-                )
+        await update.message.reply_text(
+            _STATUS_TEMPLATE.format(
+                pending_count=pending_count,
+                retry_interval_hours=settings.retry_interval_hours,
+                max_retry_count=settings.max_retry_count,
             )
-            pending_count = result.scalar() or 0
-
-        status_message = f"""📊 系統狀態
+        )
 
-✅ Bot 運作正常
-⏳ 待重試任務：{pending_count} 個
-⏰ 重試間隔：每 {settings.retry_interval_hours} 小時
-🔄 最大重試次數：{settings.max_retry_count} 次"""
+    async def _get_pending_count(self) -> int:
+        """查詢待處理的失敗任務數量（短時間快取，並合併同時進來的查詢）"""
+        async with self._status_lock:
+            if self._status_cache is not None:
+                cached_at, count = self._status_cache
+                if time.monotonic() - cached_at < self.STATUS_CACHE_TTL:
+                    return count
+
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(func.count())
+                    .select_from(FailedTask)
+                    .where(FailedTask.status == TaskStatus.PENDING.value)
+                )
+                count = result.scalar() or 0
 
-        await update.message.reply_text(status_message)
+            self._status_cache = (time.monotonic(), count)
+            return count
 
     async def handle_message(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """處理一般訊息（Instagram 連結）"""
         # 忽略非訊息更新
-        if update.message is None:
+        message = update.message
+        if message is None:
             return
-        
-        # 詳細日誌：記錄收到的訊息資訊
-        from_user = update.message.from_user
-        logger.info(f"收到訊息 - ID: {update.message.message_id}, "
-                    f"來自: {from_user.username if from_user else 'Unknown'} "
-                    f"(ID: {from_user.id if from_user else 'N/A'}, "
-                    f"is_bot: {from_user.is_bot if from_user else 'N/A'})")
 
-        # 忽略 Bot 自己的訊息
-        if update.message.from_user and update.message.from_user.is_bot:
-            logger.debug("忽略來自 Bot 的訊息")
-            return
-        
         # 忽略回覆給其他訊息的訊息（Bot 的回覆會有 reply_to_message）
         # 這可以防止 Bot 回覆中的連結被誤認為新連結
-        if update.message.reply_to_message:
+        if message.reply_to_message:
             logger.debug("忽略回覆訊息")
             return
-        
-        # 忽略編輯過的訊息（edited_message 會觸發另一個更新）
-        if update.edited_message:
+
+        # 忽略 Bot 自己的訊息
+        from_user = message.from_user
+        if from_user and from_user.is_bot:
+            logger.debug("忽略來自 Bot 的訊息")
             return
+
+        message_text = message.text or ""
         
-        # 取得訊息 ID 用於防重複處理
-        message_id = update.message.message_id
-        
-        # 檢查是否已處理過此訊息
-        if message_id in self._processed_message_ids:
-            logger.debug(f"訊息 ID {message_id} 已處理過，跳過")
+        # 忽略空訊息
+        if not message_text.strip():
+            return
+
+        # 防重複處理：只記錄通過前述過濾的訊息，被忽略的訊息不佔用記錄上限
+        # （訊息 ID 只在同一聊天室內唯一，需搭配 chat_id）
+        message_id = message.message_id
+        message_key = (message.chat_id, message_id)
+        if message_key in self._processed_message_ids:
+            logger.debug("訊息 ID %s 已處理過，跳過", message_id)
             return
         
         # 標記為已處理（在處理開始前就標記，防止重試）
-        self._processed_message_ids.add(message_id)
+        self._processed_message_ids[message_key] = None
         
-        # 限制記憶體中的 ID 數量（保留最近 1000 個）
-        if len(self._processed_message_ids) > 1000:
-            # 移除一半舊的 ID
-            ids_list = sorted(self._processed_message_ids)
-            self._processed_message_ids = set(ids_list[500:])
+        # 限制記憶體中的 ID 數量：超過上限時移除最舊的一筆（O(1)）
+        if len(self._processed_message_ids) > self.MAX_PROCESSED_MESSAGE_IDS:
+            self._processed_message_ids.popitem(last=False)
+
+        # 詳細日誌：通過前述過濾後才組字串記錄收到的訊息資訊
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"收到訊息 - ID: {message_id}, "
+                        f"來自: {from_user.username if from_user else 'Unknown'} "
+                        f"(ID: {from_user.id if from_user else 'N/A'})")
 
         chat_id = str(update.effective_chat.id)
-        message_text = update.message.text or ""
-        
-        # 忽略空訊息
-        if not message_text.strip():
-            return
 
         if not self._is_authorized(chat_id):
-            await update.message.reply_text("⛔ 您沒有使用此 Bot 的權限。")
+            await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
             return
 
-        # 優先檢查是否為 Threads URL
-        threads_url = self._extract_threads_url(message_text)
-        if threads_url and settings.threads_enabled:
+        platform, url = self._extract_url(message_text)
+
+        # 優先處理 Threads URL
+        if platform == "threads":
+            threads_url = url
             logger.info(f"收到訊息 ID {message_id}: {threads_url} (Threads)")
             
             # 檢查是否已處理過
@@ -305,22 +528,19 @@ class TelegramBotHandler:
             except (TimedOut, NetworkError) as e:
                 logger.warning(f"發送初始訊息超時，繼續處理: {e}")
                 processing_message = None
-            await self._handle_threads(threads_url, chat_id, processing_message)
+            await self._run_single_flight(
+                threads_url, chat_id, processing_message, self._handle_threads
+            )
             return
 
-        # 提取 Instagram URL
-        instagram_url = self._extract_instagram_url(message_text)
+        # Instagram URL
+        instagram_url = url
 
         if not instagram_url:
             # 只有當訊息看起來像是想分享連結時才回覆
-            if "instagram" in message_text.lower() or "threads" in message_text.lower() or "http" in message_text.lower():
-                await update.message.reply_text(
-                    "❓ 請分享有效的連結。\n"
-                    "支援格式：\n"
-                    "• instagram.com/reel/xxx\n"
-                    "• instagram.com/p/xxx\n"
-                    "• threads.net/@user/post/xxx"
-                )
+            lowered_text = message_text.lower()
+            if "instagram" in lowered_text or "threads" in lowered_text or "http" in lowered_text:
+                await update.message.reply_text(_INVALID_URL_MESSAGE)
             # 否則忽略訊息，不回覆
             return
 
@@ -358,22 +578,62 @@ class TelegramBotHandler:
 
         if is_reel:
             # Reel（影片）處理流程
-            await self._handle_reel(
-                instagram_url, chat_id, processing_message
+            await self._run_single_flight(
+                instagram_url, chat_id, processing_message, self._handle_reel
             )
         else:
             # 貼文（圖片）處理流程 - 嘗試使用 instaloader
-            await self._handle_post(
-                instagram_url, chat_id, processing_message
+            await self._run_single_flight(
+                instagram_url, chat_id, processing_message, self._handle_post
+            )
+
+    async def _save_processed_url_safely(self, **kwargs) -> None:
+        """記錄已處理的 URL；資料庫錯誤只記錄日誌，不覆蓋已送出的回覆"""
+        try:
+            await save_processed_url(**kwargs)
+        except Exception as e:
+            logger.warning(f"記錄已處理 URL 失敗: {kwargs.get('url')}: {e}")
+
+    async def _run_single_flight(
+        self,
+        url: str,
+        chat_id: str,
+        processing_message,
+        handle: Callable[[str, str, object], Awaitable[bool]],
+    ) -> None:
+        """同一 URL 同時只跑一條處理流程，其他請求等待並共用最終回覆"""
+        inflight = self._inflight_urls.get(url)
+        if inflight is not None:
+            logger.info(f"URL 正在處理中，等待既有流程結果: {url}")
+            await self._update_progress(processing_message, "⏳ 此連結正在處理中，完成後會同步結果...")
+            final_text = await asyncio.shield(inflight)
+            # 既有流程失敗或被取消時沒有可共用的回覆，改顯示失敗訊息（不沿用進度或錯誤文字）
+            await self._safe_edit_message(
+                processing_message, final_text or _SINGLE_FLIGHT_FAILED_MESSAGE
             )
+            return
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight_urls[url] = future
+        recorder = _ReplyRecorder(processing_message)
+        final_text: Optional[str] = None
+        try:
+            # 只有流程成功時，最後一次編輯才是可共用的最終回覆；
+            # 失敗（例如已排入重試）只對發起者的 chat 生效，不轉給其他請求
+            if await handle(url, chat_id, recorder):
+                final_text = recorder.last_text
+        finally:
+            del self._inflight_urls[url]
+            if not future.done():
+                future.set_result(final_text)
 
     async def _handle_reel(
         self,
         instagram_url: str,
         chat_id: str,
         processing_message,
-    ) -> None:
-        """處理 Instagram Reel（影片）"""
+    ) -> bool:
+        """處理 Instagram Reel（影片），回傳是否成功送出最終回覆"""
         try:
             # 步驟 1: 下載影片
             logger.info(f"開始處理: {instagram_url}")
@@ -387,7 +647,7 @@ class TelegramBotHandler:
                     processing_message,
                     f"❌ 下載失敗\n\n{download_result.error_message}\n\n已排入重試佇列。"
                 )
-                return
+                return False
 
             audio_path = download_result.audio_path
             video_path = download_result.video_path
@@ -395,7 +655,8 @@ class TelegramBotHandler:
             video_caption = download_result.caption  # 影片說明文
             
             # 記錄下載資訊
-            self.download_logger.log_reel_download(
+            self._log_download(
+                self.download_logger.log_reel_download,
                 instagram_url=instagram_url,
                 title=video_title,
                 video_size_bytes=download_result.video_size_bytes,
@@ -403,28 +664,44 @@ class TelegramBotHandler:
             )
 
             try:
-                # 步驟 2: 轉錄語音
+                # 步驟 2: 轉錄語音 + 視覺分析（兩者只依賴下載結果，並行執行）
                 transcript = ""
                 language = None
                 transcribe_failed = False
-                
-                if audio_path and audio_path.exists():
-                    transcribe_result = await self.transcriber.transcribe(audio_path)
-                    if transcribe_result.success and transcribe_result.transcript.strip():
-                        transcript = transcribe_result.transcript
-                        language = transcribe_result.language
-                    else:
-                        transcribe_failed = True
-                        logger.info("語音轉錄失敗或無語音內容，將只使用視覺分析")
-                else:
+                visual_description = None
+
+                # 下載器只在檔案存在時回傳路徑，不需要在事件迴圈中再 stat 一次
+                has_audio_file = audio_path is not None
+                has_video_file = video_path is not None
+
+                # 兩個步驟並行，開始前只更新一次狀態
+                if has_audio_file and has_video_file:
+                    await self._update_progress(processing_message, "⏳ 轉錄語音與分析畫面中...")
+                elif has_video_file:
+                    await self._update_progress(processing_message, "⏳ 分析畫面中...")
+
+                transcribe_result, visual_result = await asyncio.gather(
+                    self.transcriber.transcribe(audio_path) if has_audio_file else _skip(),
+                    self.visual_analyzer.analyze(video_path) if has_video_file else _skip(),
+                    return_exceptions=True,
+                )
+                # 等兩者都結束後再拋出例外（含取消），不讓另一個步驟留在背景執行；
+                # 例外照舊交給外層的錯誤處理
+                for result in (transcribe_result, visual_result):
+                    if isinstance(result, BaseException):
+                        raise result
+
+                if not has_audio_file:
                     transcribe_failed = True
                     logger.info("無音訊檔案，將只使用視覺分析")
+                elif transcribe_result.success and transcribe_result.transcript.strip():
+                    transcript = transcribe_result.transcript
+                    language = transcribe_result.language
+                else:
+                    transcribe_failed = True
+                    logger.info("語音轉錄失敗或無語音內容，將只使用視覺分析")
 
-                # 步驟 2.5: 視覺分析
-                visual_description = None
-                if video_path and video_path.exists():
-                    await self._safe_edit_message(processing_message, "⏳ 分析畫面中...")
-                    visual_result = await self.visual_analyzer.analyze(video_path)
+                if has_video_file:
                     if visual_result.success:
                         visual_description = visual_result.overall_visual_summary
                         logger.info(f"視覺分析完成，包含 {len(visual_result.frame_descriptions)} 幀描述")
@@ -439,7 +716,7 @@ class TelegramBotHandler:
                         instagram_url, chat_id, ErrorType.TRANSCRIBE, error_msg
                     )
                     await self._safe_edit_message(processing_message, f"❌ 處理失敗\n\n{error_msg}")
-                    return
+                    return False
                 
                 # 如果逐字稿為空但有貼文說明或視覺分析，記錄 fallback 資訊
                 if not transcript and (has_caption or visual_description):
@@ -451,7 +728,7 @@ class TelegramBotHandler:
                     logger.info(f"逐字稿為空，將使用 {' + '.join(fallback_sources)} 進行摘要")
 
                 # 步驟 3: 使用 LLM 生成完整 Markdown 筆記
-                await self._safe_edit_message(processing_message, "⏳ 生成筆記中...")
+                await self._update_progress(processing_message, "⏳ 生成筆記中...")
                 
                 # 判斷是否有語音內容
                 has_audio = bool(transcript and transcript.strip())
@@ -477,13 +754,13 @@ class TelegramBotHandler:
                         processing_message,
                         f"❌ 筆記生成失敗\n\n{note_result.error_message}\n\n已排入重試佇列。"
                     )
-                    return
+                    return False
 
                 # 步驟 4: 寫入知識庫（vault，如果啟用）
                 vault_result = None
                 if self.vault_sync:
                     try:
-                        await self._safe_edit_message(processing_message, "⏳ 寫入知識庫...")
+                        await self._update_progress(processing_message, "⏳ 寫入知識庫...")
                         vault_result = await self.vault_sync.upload_reel(
                             markdown_content=note_result.markdown_content,
                             title=video_title,
@@ -515,24 +792,25 @@ class TelegramBotHandler:
                     vault_result=vault_result,
                 )
 
-                await self._safe_edit_message(processing_message, reply_message)
-
-                # 儲存已處理的 URL
-                await save_processed_url(
-                    url=instagram_url,
-                    url_type="instagram_reel",
-                    chat_id=chat_id,
-                    title=video_title,
-                    note_path=None,
+                # 最終回覆與記錄已處理的 URL 互不相依，並行執行
+                await asyncio.gather(
+                    self._safe_edit_message(processing_message, reply_message),
+                    self._save_processed_url_safely(
+                        url=instagram_url,
+                        url_type="instagram_reel",
+                        chat_id=chat_id,
+                        title=video_title,
+                        note_path=None,
+                    ),
                 )
                 logger.info(f"處理完成: {instagram_url}")
+                return True
 
             finally:
-                # 清理暫存檔案
-                if audio_path:
-                    await self.downloader.cleanup(audio_path)
-                if video_path:
-                    await self.downloader.cleanup(video_path)
+                # 清理暫存檔案（背景執行，不延後處理流程結束）
+                self._run_in_background(
+                    self.downloader.cleanup_files([audio_path, video_path])
+                )
 
         except Exception as e:
             logger.error(f"處理過程發生錯誤: {e}", exc_info=True)
@@ -540,26 +818,26 @@ class TelegramBotHandler:
                 processing_message,
                 f"❌ 處理過程發生錯誤\n\n{str(e)}\n\n請稍後再試。"
             )
+            return False
 
     async def _handle_post(
         self,
         instagram_url: str,
         chat_id: str,
         processing_message,
-    ) -> None:
-        """處理 Instagram 貼文（圖片）"""
+    ) -> bool:
+        """處理 Instagram 貼文（圖片），回傳是否成功送出最終回覆"""
         try:
             # 步驟 1: 嘗試下載貼文圖片
             logger.info(f"開始處理貼文: {instagram_url}")
-            await self._safe_edit_message(processing_message, "⏳ 下載貼文中...")
+            await self._update_progress(processing_message, "⏳ 下載貼文中...")
             
             post_result = await self.downloader.download_post(instagram_url)
             
             # 如果是影片貼文，改用影片處理流程
             if not post_result.success and post_result.content_type == "reel":
                 logger.info("貼文為影片類型，切換至影片處理流程")
-                await self._handle_reel(instagram_url, chat_id, processing_message)
-                return
+                return await self._handle_reel(instagram_url, chat_id, processing_message)
             
             if not post_result.success:
                 await self._save_failed_task(
@@ -569,7 +847,7 @@ class TelegramBotHandler:
                     processing_message,
                     f"❌ 下載失敗\n\n{post_result.error_message}\n\n已排入重試佇列。"
                 )
-                return
+                return False
             
             image_paths = post_result.image_paths
             caption = post_result.caption or ""
@@ -577,16 +855,17 @@ class TelegramBotHandler:
             
             # 記錄下載資訊
             content_type = "post_carousel" if len(image_paths) > 1 else "post_image"
-            self.download_logger.log_post_download(
+            self._log_download(
+                self.download_logger.log_post_download,
                 instagram_url=instagram_url,
                 title=post_title,
-                image_paths=image_paths,
+                image_sizes_bytes=post_result.image_sizes_bytes,
                 content_type=content_type,
             )
             
             try:
                 # 步驟 2: 分析圖片（每張圖片獨立分析）
-                await self._safe_edit_message(
+                await self._update_progress(
                     processing_message,
                     f"⏳ 分析圖片中... (共 {len(image_paths)} 張)"
                 )
@@ -599,13 +878,13 @@ class TelegramBotHandler:
                         instagram_url, chat_id, ErrorType.TRANSCRIBE, error_msg
                     )
                     await self._safe_edit_message(processing_message, f"❌ 處理失敗\n\n{error_msg}")
-                    return
+                    return False
                 
                 visual_description = visual_result.overall_visual_summary
                 logger.info(f"圖片分析完成，共 {len(visual_result.frame_descriptions)} 張")
                 
                 # 步驟 3: 使用 LLM 生成完整 Markdown 筆記
-                await self._safe_edit_message(processing_message, "⏳ 生成筆記中...")
+                await self._update_progress(processing_message, "⏳ 生成筆記中...")
                 
                 note_result = await self.summarizer.generate_post_note(
                     url=instagram_url,
@@ -622,13 +901,13 @@ class TelegramBotHandler:
                         processing_message,
                         f"❌ 筆記生成失敗\n\n{note_result.error_message}\n\n已排入重試佇列。"
                     )
-                    return
+                    return False
                 
                 # 步驟 4: 寫入知識庫（vault，如果啟用）——含圖片進 assets
                 vault_result = None
                 if self.vault_sync:
                     try:
-                        await self._safe_edit_message(processing_message, "⏳ 寫入知識庫...")
+                        await self._update_progress(processing_message, "⏳ 寫入知識庫...")
                         vault_result = await self.vault_sync.upload_post(
                             markdown_content=note_result.markdown_content,
                             image_paths=image_paths,
@@ -662,21 +941,23 @@ class TelegramBotHandler:
                     vault_result=vault_result,
                 )
 
-                await self._safe_edit_message(processing_message, reply_message)
-                
-                # 儲存已處理的 URL
-                await save_processed_url(
-                    url=instagram_url,
-                    url_type="instagram_post",
-                    chat_id=chat_id,
-                    title=post_title,
-                    note_path=None,
+                # 最終回覆與記錄已處理的 URL 互不相依，並行執行
+                await asyncio.gather(
+                    self._safe_edit_message(processing_message, reply_message),
+                    self._save_processed_url_safely(
+                        url=instagram_url,
+                        url_type="instagram_post",
+                        chat_id=chat_id,
+                        title=post_title,
+                        note_path=None,
+                    ),
                 )
                 logger.info(f"貼文處理完成: {instagram_url}")
+                return True
                 
             finally:
-                # 清理暫存圖片檔案（圖片已複製到 roam_backup）
-                await self.downloader.cleanup_post_images(image_paths)
+                # 清理暫存圖片檔案（圖片已複製到 roam_backup；背景執行）
+                self._run_in_background(self.downloader.cleanup_post_images(image_paths))
         
         except Exception as e:
             logger.error(f"處理貼文過程發生錯誤: {e}", exc_info=True)
@@ -684,14 +965,15 @@ class TelegramBotHandler:
                 processing_message,
                 f"❌ 處理過程發生錯誤\n\n{str(e)}\n\n請稍後再試。"
             )
+            return False
 
     async def _handle_threads(
         self,
         threads_url: str,
         chat_id: str,
         processing_message,
-    ) -> None:
-        """處理 Threads 串文（支援圖片和影片）"""
+    ) -> bool:
+        """處理 Threads 串文（支援圖片和影片），回傳是否成功送出最終回覆"""
         media_download_result: ThreadsMediaDownloadResult = None
 
         try:
@@ -707,7 +989,7 @@ class TelegramBotHandler:
                     processing_message,
                     f"❌ 下載失敗\n\n{download_result.error_message}\n\n已排入重試佇列。"
                 )
-                return
+                return False
 
             # 取得作者名稱
             if download_result.content_type == "single_post" and download_result.post:
@@ -730,7 +1012,7 @@ class TelegramBotHandler:
                     processing_message,
                     "❌ 無法取得串文內容\n\n已排入重試佇列。"
                 )
-                return
+                return False
 
             # 步驟 3: 下載並分析媒體（如果有）
             visual_description = None
@@ -748,73 +1030,66 @@ class TelegramBotHandler:
                 download_result.content_type, "threads"
             )
             if all_media:
-                await self._safe_edit_message(
+                await self._update_progress(
                     processing_message,
                     f"⏳ 下載媒體中... ({len(all_media)} 個檔案)"
                 )
                 media_download_result = await self.threads_downloader.download_media(all_media)
 
                 if media_download_result.success:
-                    visual_parts = []
-
-                    # 分析圖片
-                    if media_download_result.image_paths:
-                        await self._safe_edit_message(
+                    image_paths = media_download_result.image_paths
+                    video_paths = media_download_result.video_paths
+                    audio_paths = media_download_result.audio_paths
+
+                    # 圖片、影片、語音三個步驟互不相依，並行執行，開始前只更新一次狀態
+                    progress_parts = []
+                    if image_paths:
+                        progress_parts.append(f"{len(image_paths)} 張圖片")
+                    if video_paths:
+                        progress_parts.append(f"{len(video_paths)} 個影片")
+                    if audio_paths:
+                        progress_parts.append("語音")
+                    if progress_parts:
+                        await self._update_progress(
                             processing_message,
-                            f"⏳ 分析圖片中... ({len(media_download_result.image_paths)} 張)"
+                            f"⏳ 分析媒體中... ({'、'.join(progress_parts)})"
                         )
-                        image_result = await self.visual_analyzer.analyze_images(
-                            media_download_result.image_paths
-                        )
-                        if image_result.success and image_result.overall_visual_summary:
-                            visual_parts.append("【圖片內容】\n" + image_result.overall_visual_summary)
 
-                    # 分析影片
-                    if media_download_result.video_paths:
-                        await self._safe_edit_message(
-                            processing_message,
-                            f"⏳ 分析影片中... ({len(media_download_result.video_paths)} 個)"
-                        )
-                        for i, video_path in enumerate(media_download_result.video_paths, 1):
-                            video_result = await self.visual_analyzer.analyze(video_path)
-                            if video_result.success and video_result.overall_visual_summary:
-                                visual_parts.append(
-                                    f"【影片 {i} 內容】\n" + video_result.overall_visual_summary
-                                )
-
-                    # 轉錄音訊（如果有）
-                    if media_download_result.audio_paths:
-                        await self._safe_edit_message(processing_message, "⏳ 轉錄語音中...")
-                        transcripts = []
-                        for audio_path in media_download_result.audio_paths:
-                            trans_result = await self.transcriber.transcribe(audio_path)
-                            if trans_result.success and trans_result.transcript:
-                                transcripts.append(trans_result.transcript)
-                        if transcripts:
-                            transcript = "\n\n".join(transcripts)
+                    image_result, video_parts, transcript = await asyncio.gather(
+                        self.visual_analyzer.analyze_images(image_paths) if image_paths else _skip(),
+                        self._analyze_threads_videos(video_paths),
+                        self._transcribe_threads_audios(audio_paths),
+                    )
+
+                    visual_parts = []
+                    if image_result and image_result.success and image_result.overall_visual_summary:
+                        visual_parts.append("【圖片內容】\n" + image_result.overall_visual_summary)
+                    visual_parts.extend(video_parts)
 
                     if visual_parts:
                         visual_description = "\n\n".join(visual_parts)
 
                     # 記錄 Threads 下載（含媒體大小）
-                    self.download_logger.log_threads_download(
+                    self._log_download(
+                        self.download_logger.log_threads_download,
                         threads_url=threads_url,
                         title=f"@{author}",
-                        image_paths=media_download_result.image_paths,
-                        video_paths=media_download_result.video_paths,
-                        audio_paths=media_download_result.audio_paths,
+                        image_sizes_bytes=media_download_result.image_sizes_bytes,
+                        video_sizes_bytes=media_download_result.video_sizes_bytes,
+                        audio_sizes_bytes=media_download_result.audio_sizes_bytes,
                         content_type=content_log_type,
                     )
             else:
                 # 純文字 Threads，無媒體
-                self.download_logger.log_threads_download(
+                self._log_download(
+                    self.download_logger.log_threads_download,
                     threads_url=threads_url,
                     title=f"@{author}",
                     content_type=content_log_type,
                 )
 
             # 步驟 4: 使用 LLM 生成筆記
-            await self._safe_edit_message(processing_message, "⏳ 生成筆記中...")
+            await self._update_progress(processing_message, "⏳ 生成筆記中...")
 
             note_result = await self.summarizer.generate_threads_note(
                 url=threads_url,
@@ -832,13 +1107,13 @@ class TelegramBotHandler:
                     processing_message,
                     f"❌ 筆記生成失敗\n\n{note_result.error_message}\n\n已排入重試佇列。"
                 )
-                return
+                return False
 
             # 步驟 5: 寫入知識庫（vault，如果啟用）——media 中僅圖片進 assets
             vault_result = None
             if self.vault_sync:
                 try:
-                    await self._safe_edit_message(processing_message, "⏳ 寫入知識庫...")
+                    await self._update_progress(processing_message, "⏳ 寫入知識庫...")
                     media_paths = []
                     if media_download_result:
                         media_paths.extend(media_download_result.image_paths or [])
@@ -886,17 +1161,19 @@ class TelegramBotHandler:
                 thread_count=thread_count,
             )
 
-            await self._safe_edit_message(processing_message, reply_message)
-            
-            # 儲存已處理的 URL
-            await save_processed_url(
-                url=threads_url,
-                url_type="threads",
-                chat_id=chat_id,
-                title=f"@{author}",
-                note_path=None,
+            # 最終回覆與記錄已處理的 URL 互不相依，並行執行
+            await asyncio.gather(
+                self._safe_edit_message(processing_message, reply_message),
+                self._save_processed_url_safely(
+                    url=threads_url,
+                    url_type="threads",
+                    chat_id=chat_id,
+                    title=f"@{author}",
+                    note_path=None,
+                ),
             )
             logger.info(f"Threads 處理完成: {threads_url}")
+            return True
 
         except Exception as e:
             logger.error(f"處理 Threads 過程發生錯誤: {e}", exc_info=True)
@@ -904,11 +1181,41 @@ class TelegramBotHandler:
                 processing_message,
                 f"❌ 處理過程發生錯誤\n\n{str(e)}\n\n請稍後再試。"
             )
+            return False
 
         finally:
-            # 清理暫存媒體檔案
+            # 清理暫存媒體檔案（在執行緒中背景執行，不延後處理流程結束）
             if media_download_result:
-                self.threads_downloader.cleanup_media(media_download_result)
+                self._run_in_background(
+                    asyncio.to_thread(self.threads_downloader.cleanup_media, media_download_result)
+                )
+
+    async def _analyze_threads_videos(self, video_paths: list) -> list[str]:
+        """並行分析 Threads 影片（最多 THREADS_VIDEO_CONCURRENCY 個同時進行），依原順序回傳描述段落"""
+        if not video_paths:
+            return []
+
+        semaphore = asyncio.Semaphore(self.THREADS_VIDEO_CONCURRENCY)
+
+        async def analyze_with_limit(video_path):
+            async with semaphore:
+                return await self.visual_analyzer.analyze(video_path)
+
+        results = await asyncio.gather(*(analyze_with_limit(p) for p in video_paths))
+        return [
+            f"【影片 {i} 內容】\n" + result.overall_visual_summary
+            for i, result in enumerate(results, 1)
+            if result.success and result.overall_visual_summary
+        ]
+
+    async def _transcribe_threads_audios(self, audio_paths: list) -> Optional[str]:
+        """依序轉錄 Threads 音訊（Whisper 佔滿 CPU，同時跑多個並不會更快）"""
+        transcripts = []
+        for audio_path in audio_paths:
+            trans_result = await self.transcriber.transcribe(audio_path)
+            if trans_result.success and trans_result.transcript:
+                transcripts.append(trans_result.transcript)
+        return "\n\n".join(transcripts) if transcripts else None
 
     def _format_threads_reply(
         self,
@@ -925,7 +1232,7 @@ class TelegramBotHandler:
     ) -> str:
         """格式化 Threads 回覆訊息"""
         # 重點列表
-        bullets_text = "\n".join([f"• {point}" for point in bullet_points])
+        bullets_text = _bullet_list(bullet_points)
 
         # 內容類型說明
         type_info_parts = []
@@ -974,18 +1281,18 @@ class TelegramBotHandler:
     ) -> str:
         """格式化回覆訊息"""
         # 重點列表
-        bullets_text = "\n".join([f"• {point}" for point in bullet_points])
+        bullets_text = _bullet_list(bullet_points)
 
         # 工具與技能部分
         tools_section = ""
         if tools_and_skills:
-            tools_text = "\n".join([f"• {tool}" for tool in tools_and_skills])
+            tools_text = _bullet_list(tools_and_skills)
             tools_section = f"\n🛠 工具與技能\n{tools_text}\n"
 
         # 視覺觀察部分
         visual_section = ""
         if visual_observations:
-            visual_text = "\n".join([f"• {obs}" for obs in visual_observations])
+            visual_text = _bullet_list(visual_observations)
             visual_section = f"\n👁 畫面觀察\n{visual_text}\n"
 
         # Roam 連結部分
@@ -1052,34 +1359,29 @@ class TelegramBotHandler:
         vault_result=None,
     ) -> str:
         """格式化簡潔版回覆訊息（用於 LLM 生成筆記模式）"""
+        # 各段落依序放入 list，最後一次 join 成完整訊息
+        parts = ["✅ 筆記生成完成！\n\n📝 摘要\n", summary, "\n\n📌 重點\n"]
+
         # 重點列表
-        bullets_text = "\n".join([f"• {point}" for point in bullet_points])
+        parts.append(_bullet_list(bullet_points))
+        parts.append("\n\n")
 
         # Roam 連結部分
         if roam_result and roam_result.success and roam_result.page_url:
-            roam_section = f"📎 筆記已儲存\n{roam_result.page_url}"
+            parts.append(f"📎 筆記已儲存\n{roam_result.page_url}")
         elif roam_result is None:
-            roam_section = "📎 筆記尚未儲存（等待確認）"
+            parts.append("📎 筆記尚未儲存（等待確認）")
         else:
-            roam_section = "📎 筆記儲存\n⚠️ 儲存失敗，已排入重試佇列"
+            parts.append("📎 筆記儲存\n⚠️ 儲存失敗，已排入重試佇列")
+        parts.append("\n")
 
         # 知識庫入庫部分
-        nlm_section = ""
         if vault_result and vault_result.success and vault_result.note_name:
-            nlm_section = f"\n📚 知識庫\n{vault_result.note_name}\n"
+            parts.append(f"\n📚 知識庫\n{vault_result.note_name}\n")
 
-        return f"""✅ 筆記生成完成！
-
-📝 摘要
-{summary}
-
-📌 重點
-{bullets_text}
-
-{roam_section}
-{nlm_section}
-🔗 原始連結
-{instagram_url}"""
+        parts.append("\n🔗 原始連結\n")
+        parts.append(instagram_url)
+        return "".join(parts)
 
     async def _error_handler(
         self, update: object, context: ContextTypes.DEFAULT_TYPE
@@ -1088,7 +1390,7 @@ class TelegramBotHandler:
         
         處理所有未被捕獲的異常，避免 "No error handlers are registered" 警告
         """
-        logger.error(f"處理更新時發生未預期錯誤: {context.error}", exc_info=context.error)
+        logger.error("處理更新時發生未預期錯誤: %s", context.error, exc_info=context.error)
         
         # 嘗試通知使用者（如果可能）
         if update and hasattr(update, 'effective_chat') and update.effective_chat:
@@ -1098,7 +1400,7 @@ class TelegramBotHandler:
                     text="❌ 發生未預期的錯誤，請稍後再試。"
                 )
             except Exception as e:
-                logger.warning(f"無法發送錯誤通知給使用者: {e}")
+                logger.warning("無法發送錯誤通知給使用者: %s", e)
 
     async def _send_review_message(
         self, processing_message, reply_message: str, callback_id: str
@@ -1193,17 +1495,24 @@ class TelegramBotHandler:
 
             # 判斷 URL 類型並分發處理
             if self.THREADS_URL_PATTERN.search(url):
-                await self._handle_threads(url, chat_id, processing_message)
+                handle = self._handle_threads
             elif self._is_reel_url(url):
-                await self._handle_reel(url, chat_id, processing_message)
+                handle = self._handle_reel
             else:
-                await self._handle_post(url, chat_id, processing_message)
+                handle = self._handle_post
+            await self._run_single_flight(url, chat_id, processing_message, handle)
             return
 
     def build_application(self) -> Application:
-        """建立並設定 Telegram Application"""
-        # 設定更寬裕的網路超時（預設 5 秒太短）
+        """建立並設定 Telegram Application
+
+        需在伺服器的事件迴圈（uvicorn 啟動後，非 Windows 為 uvloop）中呼叫，
+        由 lifespan 負責建立。
+        """
+        # 設定更寬裕的網路超時（預設 5 秒太短），並明確指定連線池大小
+        # （PTB 22 之前預設只有 1 條連線，並行處理時 API 請求會互相排隊）
         request = HTTPXRequest(
+            connection_pool_size=32,  # 連線池大小（重用 keep-alive 連線）
             connect_timeout=20.0,   # 連線超時（20 秒）
             read_timeout=30.0,      # 讀取超時（30 秒）
             write_timeout=30.0,     # 寫入超時（30 秒）
@@ -1214,6 +1523,14 @@ class TelegramBotHandler:
             Application.builder()
             .token(settings.telegram_bot_token)
             .request(request)
+            # 全域限制送出的 API 請求速率（多個聊天室並行時避免超過 Telegram 每秒 30 則上限），
+            # 遇到 RetryAfter 時依指示等待後重試
+            .rate_limiter(AIORateLimiter(
+                overall_max_rate=self.OUTBOUND_MAX_RATE,
+                max_retries=self.OUTBOUND_MAX_RETRIES,
+            ))
+            # 多則訊息並行處理（單一 Reel 可能需要數分鐘，不能讓後續訊息排隊）
+            .concurrent_updates(True)
             .build()
         )
 
@@ -1243,13 +1560,16 @@ class TelegramBotHandler:
         logger.info(f"Webhook 已設定: {webhook_url}")
 
     async def process_update(self, update_data: dict) -> None:
-        """處理來自 Webhook 的更新"""
+        """將來自 Webhook 的更新放入 Application 的 update_queue（立即返回）
+
+        實際處理由 Application.start() 啟動的背景迴圈負責，需先呼叫 start()。
+        """
         if self.application is None:
             raise RuntimeError("Application not initialized. Call build_application first.")
 
         try:
             update = Update.de_json(update_data, self.application.bot)
-            await self.application.process_update(update)
+            self.application.update_queue.put_nowait(update)
         except Exception as e:
             logger.error(f"處理更新失敗: {e}", exc_info=True)
             raise
@@ -1,8 +1,9 @@
 """應用程式設定模組"""
 
 import os
+from functools import cached_property
 from pathlib import Path
-from typing import List
+from typing import FrozenSet, List
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -79,30 +80,28 @@ class Settings(BaseSettings):
         description="Chrome CDP 專用 user-data-dir，空字串時使用 ~/.chrome-cdp-notebooklm",
     )
 
-    @property
+    @cached_property
     def allowed_chat_ids(self) -> List[str]:
-        """解析允許的 chat_id 列表"""
+        """解析允許的 chat_id 列表（首次存取時解析並快取）"""
         if not self.telegram_allowed_chat_ids:
             return []
-        return [
-            chat_id.strip()
-            for chat_id in self.telegram_allowed_chat_ids.split(",")
-            if chat_id.strip()
-        ]
+        stripped = (chat_id.strip() for chat_id in self.telegram_allowed_chat_ids.split(","))
+        return [chat_id for chat_id in stripped if chat_id]
 
-    @property
+    @cached_property
+    def allowed_chat_id_set(self) -> FrozenSet[str]:
+        """允許的 chat_id 集合（首次存取時解析並快取，供 O(1) 權限檢查）"""
+        return frozenset(self.allowed_chat_ids)
+
+    @cached_property
     def temp_video_path(self) -> Path:
-        """取得暫存影片目錄路徑"""
-        path = Path(self.temp_video_dir)
-        path.mkdir(parents=True, exist_ok=True)
-        return path
+        """取得暫存影片目錄路徑（快取 Path；目錄由寫入端在使用時建立）"""
+        return Path(self.temp_video_dir)
 
-    @property
+    @cached_property
     def instaloader_session_dir(self) -> Path:
-        """取得 Instaloader session 存放目錄"""
-        path = Path(self.instaloader_session_path)
-        path.mkdir(parents=True, exist_ok=True)
-        return path
+        """取得 Instaloader session 存放目錄（快取 Path；目錄由寫入端在使用時建立）"""
+        return Path(self.instaloader_session_path)
 
     class Config:
         env_file = ".env"
@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, create_engine
+from sqlalchemy import Column, Index, Integer, String, DateTime, Text, create_engine, delete, event, func, select
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
@@ -14,6 +14,21 @@ from app.config import settings
 # 建立資料庫引擎
 async_engine = create_async_engine(settings.database_url, echo=False)
 
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """SQLite 連線設定：WAL 讓重試排程的查詢與 Bot 的寫入可同時進行"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # WAL 模式下 NORMAL 已足夠安全，且每次 commit 少一次 fsync
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-16000")  # 約 16MB
+    cursor.close()
+
+
+if async_engine.dialect.name == "sqlite":
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
 # 建立非同步 Session 工廠
 AsyncSessionLocal = sessionmaker(
     bind=async_engine,
@@ -24,6 +39,10 @@ AsyncSessionLocal = sessionmaker(
 # 宣告式基礎類別
 Base = declarative_base()
 
+# 已處理 URL 的記憶體索引（init_db 時載入；None 表示尚未載入，一律查資料庫）
+# processed_urls 只由本模組的函式寫入，因此索引可與資料表保持一致
+_processed_url_index: Optional[set[str]] = None
+
 
 class ErrorType(str, Enum):
     """錯誤類型枚舉"""
@@ -46,6 +65,11 @@ class FailedTask(Base):
     """失敗記錄資料表"""
 
     __tablename__ = "failed_tasks"
+    __table_args__ = (
+        # 重試排程查詢 status = pending AND retry_count < N；
+        # status 為最左欄位，/status、/stats 的狀態統計也能使用
+        Index("ix_failed_tasks_status_retry", "status", "retry_count"),
+    )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
     instagram_url: str = Column(Text, nullable=False)
@@ -114,6 +138,16 @@ async def init_db() -> None:
     """初始化資料庫，建立所有表格"""
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all 不會替既有的表補建新索引，需逐一確認
+        await conn.run_sync(_create_missing_indexes)
+    await load_processed_url_index()
+
+
+def _create_missing_indexes(conn) -> None:
+    """替既有資料表補建模型上新增的索引"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
 
 
 async def get_db_session() -> AsyncSession:
@@ -122,8 +156,31 @@ async def get_db_session() -> AsyncSession:
         yield session
 
 
+# ==================== FailedTask 操作函數 ====================
+
+async def count_failed_tasks_by_status() -> dict[str, int]:
+    """以單一 GROUP BY 查詢統計各狀態的失敗任務數量
+
+    Returns:
+        {狀態: 數量}，沒有任務的狀態不會出現在結果中
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(FailedTask.status, func.count()).group_by(FailedTask.status)
+        )
+        return dict(result.all())
+
+
 # ==================== ProcessedURL 操作函數 ====================
 
+async def load_processed_url_index() -> None:
+    """將所有已處理 URL 載入記憶體索引，讓新 URL 的檢查不必查詢資料庫"""
+    global _processed_url_index
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(ProcessedURL.url))
+        _processed_url_index = set(result.scalars())
+
+
 async def check_url_processed(url: str) -> Optional[ProcessedURL]:
     """檢查 URL 是否已處理過
     
@@ -133,7 +190,9 @@ async def check_url_processed(url: str) -> Optional[ProcessedURL]:
     Returns:
         ProcessedURL 物件（如果存在），否則 None
     """
-    from sqlalchemy import select
+    # 快速路徑：索引已載入且不含此 URL，必定未處理過
+    if _processed_url_index is not None and url not in _processed_url_index:
+        return None
     
     async with AsyncSessionLocal() as session:
         result = await session.execute(
@@ -170,9 +229,11 @@ async def save_processed_url(
             note_path=note_path,
         )
         session.add(processed)
+        # expire_on_commit=False 且預設值都在 Python 端產生，commit 後欄位已齊全，不需再 refresh 查詢
         await session.commit()
-        await session.refresh(processed)
-        return processed
+    if _processed_url_index is not None:
+        _processed_url_index.add(url)
+    return processed
 
 
 async def delete_processed_url(url: str) -> bool:
@@ -184,14 +245,14 @@ async def delete_processed_url(url: str) -> bool:
     Returns:
         是否成功刪除
     """
-    from sqlalchemy import delete
-    
     async with AsyncSessionLocal() as session:
         result = await session.execute(
             delete(ProcessedURL).where(ProcessedURL.url == url)
         )
         await session.commit()
-        return result.rowcount > 0
+    if _processed_url_index is not None:
+        _processed_url_index.discard(url)
+    return result.rowcount > 0
 
 
 # ==================== NotebookLMNotebook 操作函數 ====================
@@ -205,8 +266,6 @@ async def get_notebook_by_date(date_str: str) -> Optional[NotebookLMNotebook]:
     Returns:
         NotebookLMNotebook 物件（如果存在），否則 None
     """
-    from sqlalchemy import select
-    
     async with AsyncSessionLocal() as session:
         result = await session.execute(
             select(NotebookLMNotebook).where(NotebookLMNotebook.date == date_str)
@@ -231,8 +290,6 @@ async def save_or_update_notebook(
     Returns:
         NotebookLMNotebook 物件
     """
-    from sqlalchemy import select
-    
     async with AsyncSessionLocal() as session:
         result = await session.execute(
             select(NotebookLMNotebook).where(NotebookLMNotebook.date == date_str)
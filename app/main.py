@@ -1,16 +1,49 @@
 """FastAPI 主程式入口"""
 
-import asyncio
 import logging
+import queue
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 
 from app.config import settings
-from app.database.models import init_db
+from app.database.models import init_db, TaskStatus, count_failed_tasks_by_status
 from app.bot.telegram_handler import TelegramBotHandler
-from app.scheduler.retry_job import retry_scheduler
+from app.scheduler.retry_job import get_retry_scheduler
+
+try:
+    # orjson：C 實作的 JSON 解析，webhook 解析 Telegram 更新較快（可選依賴）
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
+def _start_log_listener() -> tuple[QueueListener, list[logging.Handler]]:
+    """將 root logger 的輸出交給背景執行緒，避免在事件迴圈中阻塞 I/O
+
+    Returns:
+        (listener, 原本的 handler 列表)，關閉時交給 _stop_log_listener 還原
+    """
+    root_logger = logging.getLogger()
+    output_handlers = root_logger.handlers[:]
+    log_queue = queue.SimpleQueue()
+    root_logger.handlers = [QueueHandler(log_queue)]
+
+    listener = QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+    listener.start()
+    return listener, output_handlers
+
+
+def _stop_log_listener(
+    listener: QueueListener, output_handlers: list[logging.Handler]
+) -> None:
+    """還原 root logger 的 handler，並送出佇列中剩餘的日誌"""
+    # 先還原再停止：停止期間其他執行緒寫入的日誌直接輸出，不會卡在無人處理的佇列
+    logging.getLogger().handlers = output_handlers
+    listener.stop()
 
 
 # 設定日誌
@@ -21,58 +54,73 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# 全域 Bot Handler
-bot_handler = TelegramBotHandler()
+# 全域 Bot Handler（延遲初始化，於 lifespan 中建立）
+_bot_handler: Optional[TelegramBotHandler] = None
+
+
+def get_bot_handler() -> TelegramBotHandler:
+    """取得 TelegramBotHandler 單例"""
+    global _bot_handler
+    if _bot_handler is None:
+        _bot_handler = TelegramBotHandler()
+    return _bot_handler
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """應用程式生命週期管理"""
     # 啟動時執行
-    logger.info("正在初始化應用程式...")
-
-    # 初始化資料庫
-    await init_db()
-    logger.info("資料庫初始化完成")
-
-    # 建立 Telegram Bot Application
-    telegram_app = bot_handler.build_application()
-    await telegram_app.initialize()
-    
-    # 清除 webhook 中的舊訊息，並重新設定 webhook
+    log_listener, output_handlers = _start_log_listener()
     try:
-        # 先刪除 webhook 並清除所有 pending updates
-        await telegram_app.bot.delete_webhook(drop_pending_updates=True)
-        logger.info("已清除 webhook 舊訊息")
+        logger.info("正在初始化應用程式...")
+        bot_handler = get_bot_handler()
+        retry_scheduler = get_retry_scheduler()
+
+        # 初始化資料庫
+        await init_db()
+        logger.info("資料庫初始化完成")
+
+        # 建立 Telegram Bot Application
+        telegram_app = bot_handler.build_application()
+        await telegram_app.initialize()
+        # 啟動 update_queue 的處理迴圈（webhook 收到的更新放入佇列後由此處理）
+        await telegram_app.start()
+    
+        # 清除 webhook 中的舊訊息，並重新設定 webhook
+        try:
+            # 先刪除 webhook 並清除所有 pending updates
+            await telegram_app.bot.delete_webhook(drop_pending_updates=True)
+            logger.info("已清除 webhook 舊訊息")
         
-        # 如果有設定 webhook URL，自動重新設定
-        if settings.webhook_url:
-            webhook_full_url = f"{settings.webhook_url}/webhook/telegram"
-            await telegram_app.bot.set_webhook(url=webhook_full_url)
-            logger.info(f"已設定 webhook: {webhook_full_url}")
-    except Exception as e:
-        logger.warning(f"設定 webhook 失敗: {e}")
-
-    # 設定排程器的 Bot
-    retry_scheduler.set_bot(telegram_app.bot)
-
-    # 啟動排程器（如果啟用）
-    if settings.retry_enabled:
+            # 如果有設定 webhook URL，自動重新設定
+            if settings.webhook_url:
+                webhook_full_url = f"{settings.webhook_url}/webhook/telegram"
+                await telegram_app.bot.set_webhook(url=webhook_full_url)
+                logger.info(f"已設定 webhook: {webhook_full_url}")
+        except Exception as e:
+            logger.warning(f"設定 webhook 失敗: {e}")
+
+        # 設定排程器的 Bot
+        retry_scheduler.set_bot(telegram_app.bot)
+
+        # 啟動排程器（RETRY_ENABLED=false 時 start 不會註冊排程）
         retry_scheduler.start()
-        logger.info("排程器啟動完成")
-    else:
-        logger.info("重試排程器已停用 (RETRY_ENABLED=false)")
 
-    logger.info("應用程式初始化完成！")
+        logger.info("應用程式初始化完成！")
 
-    yield
+        yield
 
-    # 關閉時執行
-    logger.info("正在關閉應用程式...")
-    if settings.retry_enabled:
+        # 關閉時執行
+        logger.info("正在關閉應用程式...")
         retry_scheduler.stop()
-    await telegram_app.shutdown()
-    logger.info("應用程式已關閉")
+        # 先處理完佇列中剩餘的更新，再等待背景工作
+        await telegram_app.stop()
+        await bot_handler.shutdown()
+        await telegram_app.shutdown()
+        logger.info("應用程式已關閉")
+    finally:
+        # 還原日誌設定（啟動失敗時也要還原，避免日誌卡在佇列）
+        _stop_log_listener(log_listener, output_handlers)
 
 
 # 建立 FastAPI 應用程式
@@ -106,14 +154,14 @@ async def telegram_webhook(request: Request):
     Telegram Webhook 端點
 
     接收來自 Telegram 的更新
-    先立即回應 Telegram（避免超時），再在背景處理訊息
+    更新放入 Application 的 update_queue 後立即回應 Telegram（避免超時）
     """
     try:
-        update_data = await request.json()
-        logger.debug(f"收到 Telegram 更新: {update_data}")
+        update_data = _json_loads(await request.body())
+        # 每個更新都會經過：用延遲格式化，非 DEBUG 時不轉換整個 dict
+        logger.debug("收到 Telegram 更新: %s", update_data)
 
-        # 在背景處理訊息，不等待完成就先回應 Telegram
-        asyncio.create_task(process_update_in_background(update_data))
+        await get_bot_handler().process_update(update_data)
 
         return JSONResponse(content={"ok": True})
 
@@ -123,14 +171,6 @@ async def telegram_webhook(request: Request):
         return JSONResponse(content={"ok": True})
 
 
-async def process_update_in_background(update_data: dict):
-    """在背景處理 Telegram 更新"""
-    try:
-        await bot_handler.process_update(update_data)
-    except Exception as e:
-        logger.error(f"背景處理更新失敗: {e}")
-
-
 @app.post("/webhook/setup")
 async def setup_webhook(webhook_url: str):
     """
@@ -141,7 +181,7 @@ async def setup_webhook(webhook_url: str):
     """
     try:
         full_url = f"{webhook_url}/webhook/telegram"
-        await bot_handler.setup_webhook(full_url)
+        await get_bot_handler().setup_webhook(full_url)
         return {"status": "ok", "webhook_url": full_url}
     except Exception as e:
         logger.error(f"設定 Webhook 失敗: {e}")
@@ -151,33 +191,11 @@ async def setup_webhook(webhook_url: str):
 @app.get("/stats")
 async def get_stats():
     """取得系統統計資訊"""
-    from sqlalchemy import select, func
-    from app.database.models import FailedTask, TaskStatus, AsyncSessionLocal
-
-    async with AsyncSessionLocal() as session:
-        # 待處理任務數
-        pending_result = await session.execute(
-            select(func.count(FailedTask.id)).where(
-                FailedTask.status == TaskStatus.PENDING.value
-            )
-        )
-        pending_count = pending_result.scalar() or 0
-
-        # 成功任務數
-        success_result = await session.execute(
-            select(func.count(FailedTask.id)).where(
-                FailedTask.status == TaskStatus.SUCCESS.value
-            )
-        )
-        success_count = success_result.scalar() or 0
-
-        # 放棄任務數
-        abandoned_result = await session.execute(
-            select(func.count(FailedTask.id)).where(
-                FailedTask.status == TaskStatus.ABANDONED.value
-            )
-        )
-        abandoned_count = abandoned_result.scalar() or 0
+    # 一次查詢取得各狀態數量
+    counts = await count_failed_tasks_by_status()
+    pending_count = counts.get(TaskStatus.PENDING.value, 0)
+    success_count = counts.get(TaskStatus.SUCCESS.value, 0)
+    abandoned_count = counts.get(TaskStatus.ABANDONED.value, 0)
 
     return {
         "pending_tasks": pending_count,
@@ -1,5 +1,5 @@
 """排程模組"""
 
-from app.scheduler.retry_job import RetryScheduler
+from app.scheduler.retry_job import RetryScheduler, get_retry_scheduler
 
-__all__ = ["RetryScheduler"]
+__all__ = ["RetryScheduler", "get_retry_scheduler"]
@@ -2,6 +2,7 @@
 
 import logging
 from datetime import datetime
+from functools import cached_property
 from typing import Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -25,23 +26,55 @@ from app.services.roam_sync import RoamSyncService
 logger = logging.getLogger(__name__)
 
 
+_ABANDONED_TEMPLATE = """❌ 處理失敗
+
+重試已達上限（{max_retry_count} 次），任務已放棄。
+
+🔗 連結：{instagram_url}
+📝 錯誤：{error_message}
+
+請手動重新分享此連結再試一次。"""
+
+
 class RetryScheduler:
     """失敗任務重試排程器"""
 
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
-        self.downloader = InstagramDownloader()
-        self.transcriber = WhisperTranscriber()
-        self.summarizer = get_summarizer()
-        self.roam_sync = RoamSyncService()
         self.bot: Optional[Bot] = None
 
+    # 處理服務延遲到第一次重試時才建立（停用重試時不需要）
+
+    @cached_property
+    def downloader(self) -> InstagramDownloader:
+        """影片下載服務"""
+        return InstagramDownloader()
+
+    @cached_property
+    def transcriber(self) -> WhisperTranscriber:
+        """語音轉錄服務"""
+        return WhisperTranscriber()
+
+    @cached_property
+    def summarizer(self):
+        """摘要服務（依 SUMMARIZER_BACKEND 選擇）"""
+        return get_summarizer()
+
+    @cached_property
+    def roam_sync(self) -> RoamSyncService:
+        """筆記儲存服務"""
+        return RoamSyncService()
+
     def set_bot(self, bot: Bot) -> None:
         """設定 Telegram Bot 實例"""
         self.bot = bot
 
     def start(self) -> None:
-        """啟動排程器"""
+        """啟動排程器（RETRY_ENABLED=false 時不註冊任何排程）"""
+        if not settings.retry_enabled:
+            logger.info("重試已停用 (RETRY_ENABLED=false)，不啟動排程器")
+            return
+
         # 新增重試任務，每小時執行一次
         self.scheduler.add_job(
             self.retry_failed_tasks,
@@ -52,12 +85,12 @@ class RetryScheduler:
         )
 
         self.scheduler.start()
-        logger.info(
-            f"排程器已啟動，重試間隔: 每 {settings.retry_interval_hours} 小時"
-        )
+        logger.info("排程器已啟動，重試間隔: 每 %s 小時", settings.retry_interval_hours)
 
     def stop(self) -> None:
         """停止排程器"""
+        if not self.scheduler.running:
+            return
         self.scheduler.shutdown()
         logger.info("排程器已停止")
 
@@ -75,7 +108,7 @@ class RetryScheduler:
             )
             tasks = result.scalars().all()
 
-            logger.info(f"找到 {len(tasks)} 個待重試任務")
+            logger.info("找到 %d 個待重試任務", len(tasks))
 
             for task in tasks:
                 await self._retry_single_task(session, task)
@@ -86,22 +119,22 @@ class RetryScheduler:
 
     async def _retry_single_task(self, session, task: FailedTask) -> None:
         """重試單一任務"""
-        logger.info(f"重試任務: {task.instagram_url} (第 {task.retry_count + 1} 次)")
+        logger.info("重試任務: %s (第 %d 次)", task.instagram_url, task.retry_count + 1)
 
         task.increment_retry()
 
         try:
-            # 根據錯誤類型決定從哪裡開始重試
-            error_type = ErrorType(task.error_type)
+            # 根據錯誤類型決定從哪裡開始重試（直接比對資料庫中的字串，未知類型重跑完整流程）
+            error_type = task.error_type
 
-            if error_type == ErrorType.DOWNLOAD:
+            if error_type == ErrorType.DOWNLOAD.value:
                 success = await self._retry_full_process(task)
-            elif error_type == ErrorType.TRANSCRIBE:
+            elif error_type == ErrorType.TRANSCRIBE.value:
                 success = await self._retry_from_download(task)
-            elif error_type == ErrorType.SUMMARIZE:
+            elif error_type == ErrorType.SUMMARIZE.value:
                 # 需要重新下載和轉錄
                 success = await self._retry_full_process(task)
-            elif error_type == ErrorType.SYNC:
+            elif error_type == ErrorType.SYNC.value:
                 # 只需要重新同步（需要有之前的資料）
                 success = await self._retry_sync_only(task)
             else:
@@ -109,17 +142,15 @@ class RetryScheduler:
 
             if success:
                 task.mark_success()
-                logger.info(f"任務重試成功: {task.instagram_url}")
+                logger.info("任務重試成功: %s", task.instagram_url)
             else:
                 if task.retry_count >= settings.max_retry_count:
                     task.mark_abandoned()
                     await self._notify_abandoned(task)
-                    logger.warning(
-                        f"任務已達最大重試次數，標記為放棄: {task.instagram_url}"
-                    )
+                    logger.warning("任務已達最大重試次數，標記為放棄: %s", task.instagram_url)
 
         except Exception as e:
-            logger.error(f"重試任務時發生錯誤: {e}")
+            logger.error("重試任務時發生錯誤: %s", e)
             if task.retry_count >= settings.max_retry_count:
                 task.mark_abandoned()
                 await self._notify_abandoned(task)
@@ -201,7 +232,7 @@ class RetryScheduler:
             return
 
         try:
-            bullets_text = "\n".join([f"• {point}" for point in bullet_points])
+            bullets_text = "\n".join(f"• {point}" for point in bullet_points)
 
             if roam_result.success and roam_result.page_url:
                 roam_section = f"📎 Roam Research\n{roam_result.page_url}"
@@ -227,7 +258,7 @@ class RetryScheduler:
             )
 
         except Exception as e:
-            logger.error(f"發送通知失敗: {e}")
+            logger.error("發送通知失敗: %s", e)
 
     async def _notify_abandoned(self, task: FailedTask) -> None:
         """通知使用者任務已放棄"""
@@ -236,14 +267,11 @@ class RetryScheduler:
             return
 
         try:
-            message = f"""❌ 處理失敗
-
-重試已達上限（{settings.max_retry_count} 次），任務已放棄。
-
-🔗 連結：{task.instagram_url}
-📝 錯誤：{task.error_message}
-
-請手動重新分享此連結再試一次。"""
+            message = _ABANDONED_TEMPLATE.format(
+                max_retry_count=settings.max_retry_count,
+                instagram_url=task.instagram_url,
+                error_message=task.error_message,
+            )
 
             await self.bot.send_message(
                 chat_id=task.telegram_chat_id,
@@ -251,8 +279,16 @@ class RetryScheduler:
             )
 
         except Exception as e:
-            logger.error(f"發送通知失敗: {e}")
+            logger.error("發送通知失敗: %s", e)
+
+
+# 全域排程器實例（延遲初始化，於 lifespan 中建立）
+_retry_scheduler: Optional[RetryScheduler] = None
 
 
-# 建立全域排程器實例
-retry_scheduler = RetryScheduler()
+def get_retry_scheduler() -> RetryScheduler:
+    """取得 RetryScheduler 單例"""
+    global _retry_scheduler
+    if _retry_scheduler is None:
+        _retry_scheduler = RetryScheduler()
+    return _retry_scheduler
@@ -2,9 +2,14 @@
 
 import asyncio
 import logging
-import subprocess
+import os
+import re
 import shutil
+import subprocess
+import tempfile
 from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
 from typing import List, Optional
 
 from app.config import settings
@@ -14,6 +19,39 @@ from app.services.prompt_loader import get_prompt_loader
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _find_claude_cli() -> Optional[str]:
+    """尋找 Claude CLI 執行檔路徑（結果快取，安裝 CLI 後需重啟或呼叫 cache_clear）"""
+    # 嘗試在 PATH 中尋找
+    claude_path = shutil.which("claude")
+    if claude_path:
+        return claude_path
+
+    # Windows 常見路徑
+    possible_paths = [
+        os.path.expanduser("~/.claude/local/claude.exe"),
+        os.path.expanduser("~/AppData/Local/Programs/claude/claude.exe"),
+        "C:/Program Files/Claude/claude.exe",
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+
+    return None
+
+
+# markdown 粗體（**文字**）
+_BOLD_RE = re.compile(r"\*\*([^*]+)\*\*")
+
+# 重點開頭的數字編號（如 "1. "）
+_LEAD_NUM_RE = re.compile(r"^\d+\.\s*")
+
+# 列表項目的開頭符號，以及去除符號時要剝除的字元
+_BULLET_PREFIXES = ("•", "-", "*", "·")
+_BULLET_CHARS = "•-*· "
+
+
 @dataclass
 class SummaryResult:
     """摘要結果"""
@@ -134,6 +172,9 @@ class ClaudeCodeSummarizer:
 
 （如有步驟或工具，加上對應區塊）"""
 
+    # Claude CLI 執行超時（秒）
+    CLI_TIMEOUT = 120
+
     def __init__(self, model: str = "sonnet"):
         """
         初始化 Claude Code Summarizer
@@ -142,35 +183,14 @@ class ClaudeCodeSummarizer:
             model: Claude 模型名稱 (sonnet, opus, haiku)
         """
         self.model = model
-        self.claude_path = self._find_claude_cli()
+        self.claude_path = _find_claude_cli()
         # 初始化 PromptLoader（含快取機制）
         self.prompt_loader = get_prompt_loader(settings.prompts_path)
         
         if not self.claude_path:
             logger.warning("Claude Code CLI 未找到，請確保已安裝")
 
-    def _find_claude_cli(self) -> Optional[str]:
-        """尋找 Claude CLI 執行檔路徑"""
-        # 嘗試在 PATH 中尋找
-        claude_path = shutil.which("claude")
-        if claude_path:
-            return claude_path
-        
-        # Windows 常見路徑
-        import os
-        possible_paths = [
-            os.path.expanduser("~/.claude/local/claude.exe"),
-            os.path.expanduser("~/AppData/Local/Programs/claude/claude.exe"),
-            "C:/Program Files/Claude/claude.exe",
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-        
-        return None
-
-    def _run_claude_cli(self, prompt: str, system_prompt: str = None) -> str:
+    async def _run_claude_cli(self, prompt: str, system_prompt: str = None) -> str:
         """
         執行 Claude CLI 並取得回應
         
@@ -184,9 +204,6 @@ class ClaudeCodeSummarizer:
         if not self.claude_path:
             raise RuntimeError("Claude Code CLI 未安裝或未找到")
         
-        import tempfile
-        import os
-        
         # 結合系統提示和使用者提示
         if system_prompt:
             full_prompt = f"{system_prompt}\n\n---\n\n{prompt}"
@@ -208,32 +225,33 @@ class ClaudeCodeSummarizer:
         logger.info(f"執行 Claude CLI (model={self.model})")
         
         try:
-            result = subprocess.run(
+            # 在執行緒中執行阻塞的 subprocess.run：Windows 上 uvicorn --reload 使用
+            # Selector 事件迴圈，不支援 asyncio 子行程
+            # subprocess.run 超時時會自行 kill 並回收行程
+            result = await asyncio.to_thread(
+                subprocess.run,
                 cmd,
                 input=full_prompt,  # 透過 stdin 傳遞 prompt
                 capture_output=True,
                 text=True,
-                timeout=120,  # 2 分鐘超時
+                timeout=self.CLI_TIMEOUT,
                 encoding="utf-8",
                 cwd=temp_dir,  # 使用臨時目錄，避免讀取專案上下文
             )
-            
-            if result.returncode != 0:
-                error_msg = result.stderr or "Unknown error"
-                logger.error(f"Claude CLI 執行失敗: {error_msg}")
-                raise RuntimeError(f"Claude CLI 錯誤: {error_msg}")
-            
-            return result.stdout.strip()
-            
         except subprocess.TimeoutExpired:
             raise RuntimeError("Claude CLI 執行超時（超過 2 分鐘）")
         except Exception as e:
-            if "Claude CLI 錯誤" in str(e):
-                raise
             raise RuntimeError(f"執行 Claude CLI 時發生錯誤: {e}")
 
-    def _summarize_sync(self, transcript: str, visual_description: str = None) -> SummaryResult:
-        """同步摘要方法"""
+        if result.returncode != 0:
+            error_msg = result.stderr or "Unknown error"
+            logger.error(f"Claude CLI 執行失敗: {error_msg}")
+            raise RuntimeError(f"Claude CLI 錯誤: {error_msg}")
+
+        return result.stdout.strip()
+
+    async def _summarize(self, transcript: str, visual_description: str = None) -> SummaryResult:
+        """呼叫 Claude CLI 生成摘要"""
         try:
             # 根據是否有視覺描述選擇不同模板
             if visual_description:
@@ -245,7 +263,7 @@ class ClaudeCodeSummarizer:
                 user_prompt = self.USER_PROMPT_TEMPLATE.format(transcript=transcript)
             
             # 呼叫 Claude CLI
-            content = self._run_claude_cli(user_prompt, self.SYSTEM_PROMPT)
+            content = await self._run_claude_cli(user_prompt, self.SYSTEM_PROMPT)
             result = self._parse_response(content)
 
             if result.success:
@@ -285,11 +303,7 @@ class ClaudeCodeSummarizer:
                 error_message="逐字稿內容為空",
             )
 
-        # 在執行緒池中執行（避免阻塞）
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, self._summarize_sync, transcript, visual_description
-        )
+        return await self._summarize(transcript, visual_description)
 
     def _parse_response(self, content: str) -> SummaryResult:
         """
@@ -302,15 +316,13 @@ class ClaudeCodeSummarizer:
             SummaryResult: 解析後的摘要結果
         """
         try:
-            import re
-            
-            summary = ""
+            summary_parts = []
             bullet_points = []
             tools_and_skills = []
             visual_observations = []
 
             # 分割摘要和重點
-            lines = content.strip().split("\n")
+            lines = content.splitlines()
             current_section = None
 
             for line in lines:
@@ -318,30 +330,32 @@ class ClaudeCodeSummarizer:
                 if not line:
                     continue
 
-                if "【摘要】" in line or ("摘要" in line and "】" in line):
-                    current_section = "summary"
-                    continue
-                elif "【重點】" in line or ("重點" in line and "】" in line):
-                    current_section = "bullet"
-                    continue
-                elif "【工具與技能】" in line or "【工具】" in line:
-                    current_section = "tools"
-                    continue
-                elif "【畫面觀察】" in line or "【畫面】" in line:
-                    current_section = "visual"
-                    continue
-
-                # 移除 markdown bold 格式
-                clean_line = re.sub(r'\*\*([^*]+)\*\*', r'\1', line)
+                # 區塊標題必定含「】」，一般內容行只需這一次子字串檢查
+                if "】" in line:
+                    if "摘要" in line:
+                        current_section = "summary"
+                        continue
+                    elif "重點" in line:
+                        current_section = "bullet"
+                        continue
+                    elif "【工具與技能】" in line or "【工具】" in line:
+                        current_section = "tools"
+                        continue
+                    elif "【畫面觀察】" in line or "【畫面】" in line:
+                        current_section = "visual"
+                        continue
+
+                # 移除 markdown bold 格式（大多數行沒有 **，先以子字串檢查略過 regex）
+                clean_line = _BOLD_RE.sub(r"\1", line) if "**" in line else line
                 
                 # 根據當前區塊處理內容
                 if current_section == "summary":
-                    summary += clean_line + " "
+                    summary_parts.append(clean_line)
                 elif current_section == "bullet":
-                    if clean_line.startswith(("•", "-", "*", "·")):
-                        point = clean_line.lstrip("•-*· ").strip()
+                    if clean_line.startswith(_BULLET_PREFIXES):
+                        point = clean_line.lstrip(_BULLET_CHARS).strip()
                         # 移除開頭的數字編號如 "1. "
-                        point = re.sub(r'^\d+\.\s*', '', point)
+                        point = _LEAD_NUM_RE.sub("", point)
                         if point:
                             bullet_points.append(point)
                     elif clean_line[0].isdigit() and "." in clean_line[:3]:
@@ -349,17 +363,17 @@ class ClaudeCodeSummarizer:
                         if point:
                             bullet_points.append(point)
                 elif current_section == "tools":
-                    if clean_line.startswith(("•", "-", "*", "·")):
-                        tool = clean_line.lstrip("•-*· ").strip()
+                    if clean_line.startswith(_BULLET_PREFIXES):
+                        tool = clean_line.lstrip(_BULLET_CHARS).strip()
                         if tool:
                             tools_and_skills.append(tool)
                 elif current_section == "visual":
-                    if clean_line.startswith(("•", "-", "*", "·")):
-                        obs = clean_line.lstrip("•-*· ").strip()
+                    if clean_line.startswith(_BULLET_PREFIXES):
+                        obs = clean_line.lstrip(_BULLET_CHARS).strip()
                         if obs:
                             visual_observations.append(obs)
 
-            summary = summary.strip()
+            summary = " ".join(summary_parts).strip()
 
             # 如果解析失敗，使用整個內容作為摘要
             if not summary:
@@ -388,7 +402,7 @@ class ClaudeCodeSummarizer:
 
     # ==================== 筆記生成功能 ====================
 
-    def _generate_note_sync(
+    async def _generate_note(
         self,
         url: str,
         title: str,
@@ -397,9 +411,8 @@ class ClaudeCodeSummarizer:
         has_audio: bool = True,
         caption: str = None,
     ) -> NoteResult:
-        """同步生成筆記方法"""
+        """呼叫 Claude CLI 生成筆記"""
         try:
-            from datetime import datetime
             processed_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
             # 組合內容（與 Ollama 版本格式一致）
@@ -446,7 +459,7 @@ class ClaudeCodeSummarizer:
             )
             
             # 呼叫 Claude CLI
-            markdown_content = self._run_claude_cli(user_prompt, note_system_prompt)
+            markdown_content = await self._run_claude_cli(user_prompt, note_system_prompt)
             
             # 提取摘要和重點用於 Telegram 回覆
             summary, bullet_points = self._extract_summary_for_telegram(markdown_content)
@@ -477,10 +490,10 @@ class ClaudeCodeSummarizer:
 
     def _extract_summary_for_telegram(self, markdown_content: str) -> tuple:
         """從 Markdown 內容中提取摘要和重點用於 Telegram 回覆"""
-        summary = ""
+        summary_parts = []
         bullet_points = []
         
-        lines = markdown_content.split("\n")
+        lines = markdown_content.splitlines()
         current_section = None
         
         for line in lines:
@@ -499,13 +512,13 @@ class ClaudeCodeSummarizer:
             
             # 提取內容
             if current_section == "summary" and stripped and not stripped.startswith("#"):
-                summary += stripped + " "
+                summary_parts.append(stripped)
             elif current_section == "bullet" and stripped.startswith("-"):
                 point = stripped[1:].strip()
                 if point:
                     bullet_points.append(point)
         
-        return summary.strip(), bullet_points
+        return " ".join(summary_parts), bullet_points
 
     async def generate_note(
         self,
@@ -537,17 +550,8 @@ class ClaudeCodeSummarizer:
                 error_message="沒有可用的內容（無逐字稿、無視覺描述、無貼文說明）",
             )
 
-        # 在執行緒池中執行（避免阻塞）
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._generate_note_sync,
-            url,
-            title,
-            transcript,
-            visual_description,
-            has_audio,
-            caption,
+        return await self._generate_note(
+            url, title, transcript, visual_description, has_audio, caption
         )
 
     # ==================== 貼文筆記生成功能 ====================
@@ -589,16 +593,15 @@ class ClaudeCodeSummarizer:
    - 【重要】全部使用繁體中文，不要使用簡體中文
    - 【重要】直接輸出 Markdown 文字，不要建立檔案，不要使用 create_file 等工具"""
 
-    def _generate_post_note_sync(
+    async def _generate_post_note(
         self,
         url: str,
         title: str,
         caption: str,
         visual_description: str,
     ) -> NoteResult:
-        """同步生成貼文筆記方法"""
+        """呼叫 Claude CLI 生成貼文筆記"""
         try:
-            from datetime import datetime
             processed_time = datetime.now().strftime("%Y-%m-%d %H:%M")
             
             # 建立使用者 prompt
@@ -617,7 +620,7 @@ class ClaudeCodeSummarizer:
             )
             
             # 呼叫 Claude CLI
-            markdown_content = self._run_claude_cli(user_prompt, note_system_prompt)
+            markdown_content = await self._run_claude_cli(user_prompt, note_system_prompt)
             
             # 提取摘要和重點用於 Telegram 回覆
             summary, bullet_points = self._extract_summary_for_telegram(markdown_content)
@@ -659,16 +662,7 @@ class ClaudeCodeSummarizer:
         Returns:
             NoteResult: 筆記生成結果
         """
-        # 在執行緒池中執行（避免阻塞）
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._generate_post_note_sync,
-            url,
-            title,
-            caption,
-            visual_description,
-        )
+        return await self._generate_post_note(url, title, caption, visual_description)
 
 
     # ==================== Threads 筆記生成功能 ====================
@@ -704,7 +698,7 @@ class ClaudeCodeSummarizer:
 ## 提及的資源
 （工具、連結、書籍等，若無則標註「無」）"""
 
-    def _generate_threads_note_sync(
+    async def _generate_threads_note(
         self,
         url: str,
         author: str,
@@ -712,9 +706,8 @@ class ClaudeCodeSummarizer:
         visual_description: str = None,
         transcript: str = None,
     ) -> NoteResult:
-        """同步生成 Threads 筆記方法"""
+        """呼叫 Claude CLI 生成 Threads 筆記"""
         try:
-            from datetime import datetime
             processed_time = datetime.now().strftime("%Y-%m-%d %H:%M")
 
             # 組合完整內容（文字 + 媒體描述 + 轉錄）
@@ -752,7 +745,7 @@ class ClaudeCodeSummarizer:
             )
 
             # 呼叫 Claude CLI
-            markdown_content = self._run_claude_cli(user_prompt, note_system_prompt)
+            markdown_content = await self._run_claude_cli(user_prompt, note_system_prompt)
 
             # 提取摘要和重點用於 Telegram 回覆
             summary, bullet_points = self._extract_summary_for_telegram(markdown_content)
@@ -808,23 +801,11 @@ class ClaudeCodeSummarizer:
                 error_message="沒有可用的串文內容",
             )
 
-        # 在執行緒池中執行（避免阻塞）
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._generate_threads_note_sync,
-            url,
-            author,
-            content,
-            visual_description,
-            transcript,
+        return await self._generate_threads_note(
+            url, author, content, visual_description, transcript
         )
 
 
 def check_claude_cli_available() -> bool:
     """檢查 Claude Code CLI 是否可用"""
-    try:
-        summarizer = ClaudeCodeSummarizer()
-        return summarizer.claude_path is not None
-    except Exception:
-        return False
+    return _find_claude_cli() is not None
@@ -3,6 +3,7 @@
 import csv
 import json
 import logging
+import threading
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
@@ -51,6 +52,8 @@ class DownloadLogger:
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.json_log_path = self.log_dir / "download_log.json"
         self.csv_log_path = self.log_dir / "download_log.csv"
+        # 記錄可能由多個執行緒同時寫入，JSON 為讀取後整份寫回，需序列化
+        self._write_lock = threading.Lock()
         
         # 確保 JSON 檔案存在
         if not self.json_log_path.exists():
@@ -142,7 +145,7 @@ class DownloadLogger:
         self,
         instagram_url: str,
         title: Optional[str] = None,
-        image_paths: Optional[List[Path]] = None,
+        image_sizes_bytes: Optional[List[int]] = None,
         content_type: str = "post_image",
     ) -> DownloadLogEntry:
         """
@@ -151,21 +154,14 @@ class DownloadLogger:
         Args:
             instagram_url: Instagram 連結
             title: 貼文標題
-            image_paths: 圖片路徑列表
+            image_sizes_bytes: 各圖片大小（位元組）
             content_type: 內容類型（post_image 或 post_carousel）
             
         Returns:
             DownloadLogEntry: 記錄條目
         """
-        image_sizes = []
-        total_size = 0
-        
-        if image_paths:
-            for path in image_paths:
-                if path.exists():
-                    size = path.stat().st_size
-                    image_sizes.append(size)
-                    total_size += size
+        image_sizes = image_sizes_bytes or []
+        total_size = sum(image_sizes)
         
         entry = DownloadLogEntry(
             timestamp=datetime.now().isoformat(),
@@ -188,9 +184,9 @@ class DownloadLogger:
         self,
         threads_url: str,
         title: Optional[str] = None,
-        image_paths: Optional[List[Path]] = None,
-        video_paths: Optional[List[Path]] = None,
-        audio_paths: Optional[List[Path]] = None,
+        image_sizes_bytes: Optional[List[int]] = None,
+        video_sizes_bytes: Optional[List[int]] = None,
+        audio_sizes_bytes: Optional[List[int]] = None,
         content_type: str = "threads",
     ) -> DownloadLogEntry:
         """
@@ -199,39 +195,18 @@ class DownloadLogger:
         Args:
             threads_url: Threads 連結
             title: 貼文標題（通常為 @author）
-            image_paths: 圖片路徑列表
-            video_paths: 影片路徑列表
-            audio_paths: 音訊路徑列表
+            image_sizes_bytes: 各圖片大小（位元組）
+            video_sizes_bytes: 各影片大小（位元組）
+            audio_sizes_bytes: 各音訊大小（位元組）
             content_type: 內容類型（threads 或 threads_conversation）
             
         Returns:
             DownloadLogEntry: 記錄條目
         """
-        image_sizes = []
-        video_size = 0
-        audio_size = 0
-        total_size = 0
-        
-        if image_paths:
-            for path in image_paths:
-                if path.exists():
-                    size = path.stat().st_size
-                    image_sizes.append(size)
-                    total_size += size
-        
-        if video_paths:
-            for path in video_paths:
-                if path.exists():
-                    size = path.stat().st_size
-                    video_size += size
-                    total_size += size
-        
-        if audio_paths:
-            for path in audio_paths:
-                if path.exists():
-                    size = path.stat().st_size
-                    audio_size += size
-                    total_size += size
+        image_sizes = image_sizes_bytes or []
+        video_size = sum(video_sizes_bytes or [])
+        audio_size = sum(audio_sizes_bytes or [])
+        total_size = sum(image_sizes) + video_size + audio_size
         
         entry = DownloadLogEntry(
             timestamp=datetime.now().isoformat(),
@@ -246,12 +221,12 @@ class DownloadLogger:
         
         self._save_entry(entry)
         media_counts = []
-        if image_paths:
-            media_counts.append(f"{len(image_paths)} 張圖片")
-        if video_paths:
-            media_counts.append(f"{len(video_paths)} 個影片")
-        if audio_paths:
-            media_counts.append(f"{len(audio_paths)} 個音訊")
+        if image_sizes_bytes:
+            media_counts.append(f"{len(image_sizes_bytes)} 張圖片")
+        if video_sizes_bytes:
+            media_counts.append(f"{len(video_sizes_bytes)} 個影片")
+        if audio_sizes_bytes:
+            media_counts.append(f"{len(audio_sizes_bytes)} 個音訊")
         media_info = ", ".join(media_counts) if media_counts else "純文字"
         logger.info(
             f"已記錄 Threads 下載: {threads_url} | "
@@ -262,10 +237,11 @@ class DownloadLogger:
 
     def _save_entry(self, entry: DownloadLogEntry) -> None:
         """儲存記錄條目到 JSON 和 CSV"""
-        # 儲存到 JSON
-        self._append_to_json(entry)
-        # 儲存到 CSV
-        self._append_to_csv(entry)
+        with self._write_lock:
+            # 儲存到 JSON
+            self._append_to_json(entry)
+            # 儲存到 CSV
+            self._append_to_csv(entry)
     
     def _append_to_json(self, entry: DownloadLogEntry) -> None:
         """追加記錄到 JSON 檔案"""
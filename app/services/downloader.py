@@ -23,8 +23,8 @@ class DownloadResult:
     """下載結果"""
 
     success: bool
-    video_path: Optional[Path] = None
-    audio_path: Optional[Path] = None
+    video_path: Optional[Path] = None  # 僅在檔案確實存在時設定
+    audio_path: Optional[Path] = None  # 僅在檔案確實存在時設定
     title: Optional[str] = None
     caption: Optional[str] = None  # 影片說明文（貼文內容）
     error_message: Optional[str] = None
@@ -42,6 +42,7 @@ class PostDownloadResult:
     caption: Optional[str] = None
     title: Optional[str] = None
     error_message: Optional[str] = None
+    image_sizes_bytes: List[int] = field(default_factory=list)  # 各圖片大小（位元組，與 image_paths 對應）
 
 
 class InstagramDownloader:
@@ -54,11 +55,10 @@ class InstagramDownloader:
         r"https?://(?:www\.)?instagram\.com/reels/([A-Za-z0-9_-]+)",
     ]
     
-    # Reel 專用 pattern（用於區分內容類型）
-    REEL_PATTERNS = [
-        r"https?://(?:www\.)?instagram\.com/reel/([A-Za-z0-9_-]+)",
-        r"https?://(?:www\.)?instagram\.com/reels/([A-Za-z0-9_-]+)",
-    ]
+    # Reel 專用 pattern（用於區分內容類型；只看 URL 形狀，預先編譯成單一正則）
+    REEL_URL_PATTERN = re.compile(
+        r"https?://(?:www\.)?instagram\.com/reels?/([A-Za-z0-9_-]+)"
+    )
     
     # 嘗試的瀏覽器順序
     BROWSERS_TO_TRY = ["chrome", "edge", "firefox", "brave", "opera", "chromium"]
@@ -201,6 +201,7 @@ class InstagramDownloader:
                             self._instaloader_username = test_user
 
                             # 儲存 session 供後續使用
+                            self.session_dir.mkdir(parents=True, exist_ok=True)
                             session_path = self.session_dir / f"session-{test_user}"
                             L.save_session_to_file(str(session_path))
                             logger.info(f"✅ 從 cookies.txt 建立 session 並儲存: {test_user}")
@@ -222,10 +223,7 @@ class InstagramDownloader:
 
     def is_reel_url(self, url: str) -> bool:
         """判斷 URL 是否為 Reel（影片）"""
-        for pattern in self.REEL_PATTERNS:
-            if re.match(pattern, url):
-                return True
-        return False
+        return self.REEL_URL_PATTERN.match(url) is not None
 
     def validate_url(self, url: str) -> bool:
         """驗證是否為有效的 Instagram Reels 連結"""
@@ -262,6 +260,7 @@ class InstagramDownloader:
 
         # 生成唯一檔名
         file_id = str(uuid.uuid4())[:8]
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
         output_template = str(self.temp_dir / f"{file_id}")
 
         # 先下載影片（供視覺分析用）
@@ -511,6 +510,20 @@ class InstagramDownloader:
         except Exception as e:
             logger.warning(f"刪除暫存檔案失敗: {e}")
 
+    async def cleanup_files(self, file_paths: List[Optional[Path]]) -> None:
+        """在執行緒中一次清理多個暫存檔案（不阻塞事件迴圈）"""
+        await asyncio.to_thread(self._cleanup_files_sync, [p for p in file_paths if p])
+
+    def _cleanup_files_sync(self, file_paths: List[Path]) -> None:
+        """同步清理多個暫存檔案"""
+        for file_path in file_paths:
+            try:
+                if file_path.exists():
+                    file_path.unlink()
+                    logger.info(f"已刪除暫存檔案: {file_path}")
+            except Exception as e:
+                logger.warning(f"刪除暫存檔案失敗: {e}")
+
     async def download_post(self, url: str) -> PostDownloadResult:
         """
         下載 Instagram 貼文（圖片 + 說明文字）
@@ -625,6 +638,7 @@ class InstagramDownloader:
                 image_paths=image_paths,
                 caption=caption,
                 title=title,
+                image_sizes_bytes=[path.stat().st_size for path in image_paths],
             )
             
         except instaloader.exceptions.ProfileNotExistsException:
@@ -656,7 +670,11 @@ class InstagramDownloader:
             )
 
     async def cleanup_post_images(self, image_paths: List[Path]) -> None:
-        """清理貼文圖片暫存檔案"""
+        """清理貼文圖片暫存檔案（在執行緒中執行，不阻塞事件迴圈）"""
+        await asyncio.to_thread(self._cleanup_post_images_sync, image_paths)
+
+    def _cleanup_post_images_sync(self, image_paths: List[Path]) -> None:
+        """同步清理貼文圖片暫存檔案"""
         for image_path in image_paths:
             try:
                 if image_path and image_path.exists():
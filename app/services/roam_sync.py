@@ -85,7 +85,7 @@ class RoamSyncService:
         processed_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # 構建重點列表
-        bullet_text = "\n".join([f"- {point}" for point in bullet_points])
+        bullet_text = "\n".join(f"- {point}" for point in bullet_points)
 
         content = f"""{{{{[[TODO]]}}}} #[[Instagram摘要]]
 
@@ -105,7 +105,7 @@ class RoamSyncService:
 
         # 如果有工具與技能，添加到內容中
         if tools_and_skills:
-            tools_text = "\n".join([f"- {tool}" for tool in tools_and_skills])
+            tools_text = "\n".join(f"- {tool}" for tool in tools_and_skills)
             content += f"""
 ## 工具與技能
 
@@ -114,7 +114,7 @@ class RoamSyncService:
 
         # 如果有視覺觀察，添加到內容中
         if visual_observations:
-            visual_text = "\n".join([f"- {obs}" for obs in visual_observations])
+            visual_text = "\n".join(f"- {obs}" for obs in visual_observations)
             content += f"""
 ## 畫面觀察
 
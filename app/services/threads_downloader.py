@@ -40,6 +40,10 @@ class ThreadsMediaDownloadResult:
     video_paths: List[Path] = field(default_factory=list)
     audio_paths: List[Path] = field(default_factory=list)  # 從影片中提取的音訊
     error_message: Optional[str] = None
+    # 各檔案大小（位元組，與對應的路徑列表一一對應）
+    image_sizes_bytes: List[int] = field(default_factory=list)
+    video_sizes_bytes: List[int] = field(default_factory=list)
+    audio_sizes_bytes: List[int] = field(default_factory=list)
 
 
 @dataclass
@@ -1325,14 +1329,29 @@ class ThreadsDownloader:
             f"{len(video_paths)} 個影片, {len(audio_paths)} 個音訊"
         )
 
+        # 在執行緒中取得檔案大小（供下載記錄使用，暫存檔稍後會被清理）
+        sizes = await loop.run_in_executor(
+            None, self._file_sizes_sync, image_paths + video_paths + audio_paths
+        )
+        video_start = len(image_paths)
+        audio_start = video_start + len(video_paths)
+
         return ThreadsMediaDownloadResult(
             success=success,
             image_paths=image_paths,
             video_paths=video_paths,
             audio_paths=audio_paths,
             error_message=error_message,
+            image_sizes_bytes=sizes[:video_start],
+            video_sizes_bytes=sizes[video_start:audio_start],
+            audio_sizes_bytes=sizes[audio_start:],
         )
 
+    @staticmethod
+    def _file_sizes_sync(paths: List[Path]) -> List[int]:
+        """取得剛下載檔案的大小（位元組），與路徑一一對應"""
+        return [path.stat().st_size for path in paths]
+
     def cleanup_media(self, result: ThreadsMediaDownloadResult) -> None:
         """
         清理暫存的媒體檔案
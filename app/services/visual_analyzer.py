@@ -125,12 +125,13 @@ class VideoVisualAnalyzer:
         else:
             return self.MAX_FRAMES  # 10 幀
 
-    def _extract_frames(self, video_path: Path) -> List[Path]:
+    def _extract_frames(self, video_path: Path, duration: float) -> List[Path]:
         """
         使用 FFmpeg 從影片中截取關鍵幀
         
         Args:
             video_path: 影片路徑
+            duration: 影片長度（秒），由呼叫端以 _get_video_duration 取得，避免重複執行 FFprobe
             
         Returns:
             截取的幀圖片路徑列表
@@ -138,8 +139,7 @@ class VideoVisualAnalyzer:
         frames_dir = self.temp_dir / f"frames_{video_path.stem}"
         frames_dir.mkdir(parents=True, exist_ok=True)
         
-        # 取得影片長度並計算幀數
-        duration = self._get_video_duration(video_path)
+        # 依影片長度計算幀數
         frame_count = self._calculate_frame_count(duration)
         
         # 計算 fps（確保均勻分佈在整部影片）
@@ -520,12 +520,12 @@ class VideoVisualAnalyzer:
             VisualAnalysisResult: 視覺分析結果
         """
         try:
-            # 取得影片長度
-            duration = self._get_video_duration(video_path)
+            # 取得影片長度（ffprobe / ffmpeg 為阻塞式子程序，移到執行緒避免卡住事件迴圈）
+            duration = await asyncio.to_thread(self._get_video_duration, video_path)
             
             # 截取關鍵幀
             logger.info("正在截取影片關鍵幀...")
-            frames = self._extract_frames(video_path)
+            frames = await asyncio.to_thread(self._extract_frames, video_path, duration)
             
             if not frames:
                 return VisualAnalysisResult(
@@ -564,7 +564,7 @@ class VideoVisualAnalyzer:
             overall_summary = "\n".join(visual_texts)
             
             # 清理暫存幀
-            self._cleanup_frames(frames)
+            await asyncio.to_thread(self._cleanup_frames, frames)
             
             logger.info("視覺分析完成")
             
@@ -39,7 +39,7 @@ async def test_simple_prompt():
     summarizer = ClaudeCodeSummarizer()
     
     try:
-        response = summarizer._run_claude_cli(
+        response = await summarizer._run_claude_cli(
             "請用繁體中文回答：什麼是 Python？用一句話說明。",
         )
         print(f"✅ 回應: {response}")
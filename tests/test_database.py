@@ -0,0 +1,118 @@
+"""資料庫操作函數測試"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import models
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path, monkeypatch):
+    """以暫存 SQLite 檔案取代正式資料庫"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    monkeypatch.setattr(
+        models,
+        "AsyncSessionLocal",
+        sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    monkeypatch.setattr(models, "_processed_url_index", None)
+    yield engine
+    await engine.dispose()
+
+
+class TestProcessedUrlIndex:
+    """已處理 URL 記憶體索引"""
+
+    @pytest.mark.asyncio
+    async def test_index_tracks_save_and_delete(self, db):
+        url = "https://instagram.com/reel/ABC"
+        await models.save_processed_url(url=url, url_type="instagram_reel", chat_id="1")
+        await models.load_processed_url_index()
+        assert models._processed_url_index == {url}
+
+        assert (await models.check_url_processed(url)).url == url
+
+        assert await models.delete_processed_url(url) is True
+        assert url not in models._processed_url_index
+        assert await models.check_url_processed(url) is None
+
+        await models.save_processed_url(url=url, url_type="instagram_reel", chat_id="1")
+        assert url in models._processed_url_index
+
+    @pytest.mark.asyncio
+    async def test_saved_row_is_fully_loaded(self, db):
+        processed = await models.save_processed_url(
+            url="https://instagram.com/p/X", url_type="instagram_post", chat_id="1", title="標題"
+        )
+
+        assert processed.id is not None
+        assert processed.processed_at is not None
+        assert processed.title == "標題"
+
+    @pytest.mark.asyncio
+    async def test_unknown_url_skips_database(self, db, monkeypatch):
+        await models.load_processed_url_index()
+
+        def fail_session():
+            raise AssertionError("不應查詢資料庫")
+
+        monkeypatch.setattr(models, "AsyncSessionLocal", fail_session)
+        assert await models.check_url_processed("https://instagram.com/reel/NEW") is None
+
+
+class TestCountFailedTasksByStatus:
+    """失敗任務狀態統計"""
+
+    @pytest.mark.asyncio
+    async def test_counts_grouped_by_status(self, db):
+        async with models.AsyncSessionLocal() as session:
+            session.add_all([
+                models.FailedTask(
+                    instagram_url=f"https://instagram.com/reel/{i}",
+                    telegram_chat_id="1",
+                    error_type=models.ErrorType.DOWNLOAD.value,
+                    status=status,
+                )
+                for i, status in enumerate(["pending", "pending", "abandoned"])
+            ])
+            await session.commit()
+
+        assert await models.count_failed_tasks_by_status() == {"pending": 2, "abandoned": 1}
+
+
+class TestFailedTaskIndexes:
+    """失敗任務索引"""
+
+    @pytest.mark.asyncio
+    async def test_retry_query_uses_composite_index(self, db):
+        async with db.connect() as conn:
+            result = await conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM failed_tasks "
+                "WHERE status = 'pending' AND retry_count < 3"
+            )
+            plan = " ".join(str(row[-1]) for row in result)
+
+        assert "ix_failed_tasks_status_retry" in plan
+
+
+class TestSqlitePragmas:
+    """SQLite 連線設定"""
+
+    @pytest.mark.asyncio
+    async def test_connect_enables_wal(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'wal.db'}")
+        event.listen(engine.sync_engine, "connect", models._set_sqlite_pragmas)
+        try:
+            async with engine.connect() as conn:
+                journal_mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+                synchronous = (await conn.exec_driver_sql("PRAGMA synchronous")).scalar()
+        finally:
+            await engine.dispose()
+
+        assert journal_mode == "wal"
+        assert synchronous == 1  # NORMAL
@@ -0,0 +1,60 @@
+"""下載記錄服務測試"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.download_logger import DownloadLogger
+from app.services.threads_downloader import ThreadsDownloader, ThreadsMedia
+
+
+class TestDownloadLogger:
+    """DownloadLogger 測試"""
+
+    def test_concurrent_writes_keep_every_entry(self, tmp_path):
+        """多個執行緒同時寫入時，JSON 記錄不會遺失條目"""
+        download_logger = DownloadLogger(log_dir=tmp_path)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for i in range(20):
+                executor.submit(
+                    download_logger.log_reel_download,
+                    instagram_url=f"https://instagram.com/reel/{i}",
+                    video_size_bytes=1024,
+                )
+
+        logs = download_logger.get_all_logs()
+        assert sorted(log["instagram_url"] for log in logs) == sorted(
+            f"https://instagram.com/reel/{i}" for i in range(20)
+        )
+
+    @pytest.mark.asyncio
+    async def test_sizes_survive_media_cleanup(self, tmp_path):
+        """大小由下載器在清理前取得，之後刪除檔案也不影響記錄"""
+        download_logger = DownloadLogger(log_dir=tmp_path / "logs")
+        image = tmp_path / "a.jpg"
+        video = tmp_path / "b.mp4"
+        image.write_bytes(b"x" * 10)
+        video.write_bytes(b"x" * 30)
+
+        downloader = ThreadsDownloader()
+        downloader._download_image_sync = lambda url: image
+        downloader._download_video_sync = lambda url: (video, None)
+        result = await downloader.download_media([
+            ThreadsMedia(url="https://cdn/a.jpg", media_type="image"),
+            ThreadsMedia(url="https://cdn/b.mp4", media_type="video"),
+        ])
+        downloader.cleanup_media(result)
+        assert not image.exists()
+
+        download_logger.log_threads_download(
+            threads_url="https://threads.net/t/ABC",
+            image_sizes_bytes=result.image_sizes_bytes,
+            video_sizes_bytes=result.video_sizes_bytes,
+            audio_sizes_bytes=result.audio_sizes_bytes,
+        )
+
+        log = download_logger.get_all_logs()[0]
+        assert log["image_sizes_bytes"] == [10]
+        assert log["video_size_bytes"] == 30
+        assert log["total_size_bytes"] == 40
@@ -36,6 +36,12 @@ class TestInstagramDownloader:
         url = "https://instagram.com/reel/ABC123xyz"
         assert self.downloader.validate_url(url) is True
 
+    def test_is_reel_url(self):
+        """測試區分 Reel 與一般貼文"""
+        assert self.downloader.is_reel_url("https://www.instagram.com/reel/ABC123xyz") is True
+        assert self.downloader.is_reel_url("https://instagram.com/reels/ABC123xyz") is True
+        assert self.downloader.is_reel_url("https://www.instagram.com/p/ABC123xyz") is False
+
     def test_extract_post_id(self):
         """測試提取貼文 ID"""
         url = "https://www.instagram.com/reel/ABC123xyz"
@@ -0,0 +1,41 @@
+"""FastAPI 主程式測試"""
+
+import logging
+
+from app.main import _start_log_listener, _stop_log_listener
+
+
+class _ListHandler(logging.Handler):
+    """收集日誌紀錄"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestLogListener:
+    """日誌背景輸出"""
+
+    def test_stop_restores_handlers_across_cycles(self):
+        root_logger = logging.getLogger()
+        saved_handlers, saved_level = root_logger.handlers[:], root_logger.level
+        output = _ListHandler()
+        root_logger.handlers = [output]
+        root_logger.setLevel(logging.INFO)
+        test_logger = logging.getLogger("tests.main")
+        try:
+            for cycle in range(2):
+                listener, output_handlers = _start_log_listener()
+                test_logger.info("queued %d", cycle)
+                _stop_log_listener(listener, output_handlers)
+
+                assert root_logger.handlers == [output]
+
+            test_logger.info("after shutdown")
+        finally:
+            root_logger.handlers, root_logger.level = saved_handlers, saved_level
+
+        assert output.messages == ["queued 0", "queued 1", "after shutdown"]
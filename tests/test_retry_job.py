@@ -0,0 +1,92 @@
+"""失敗任務重試排程測試"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.database.models import FailedTask
+from app.scheduler import retry_job
+from app.scheduler.retry_job import RetryScheduler, get_retry_scheduler
+
+
+class TestLazyServices:
+    """處理服務延遲建立"""
+
+    def test_services_created_on_first_access(self):
+        with patch("app.scheduler.retry_job.WhisperTranscriber") as transcriber_cls:
+            scheduler = RetryScheduler()
+            transcriber_cls.assert_not_called()
+
+            assert scheduler.transcriber is scheduler.transcriber
+            transcriber_cls.assert_called_once_with()
+
+
+class TestRetryEnabled:
+    """RETRY_ENABLED 開關"""
+
+    def test_disabled_skips_job_registration(self, monkeypatch):
+        monkeypatch.setattr("app.scheduler.retry_job.settings.retry_enabled", False)
+        scheduler = RetryScheduler()
+
+        scheduler.start()
+
+        assert scheduler.scheduler.get_jobs() == []
+        assert not scheduler.scheduler.running
+        # 未啟動時停止不應拋出例外
+        scheduler.stop()
+
+
+class TestGetRetryScheduler:
+    """排程器單例"""
+
+    def test_created_on_first_call(self, monkeypatch):
+        monkeypatch.setattr(retry_job, "_retry_scheduler", None)
+
+        scheduler = get_retry_scheduler()
+
+        assert isinstance(scheduler, RetryScheduler)
+        assert get_retry_scheduler() is scheduler
+
+
+class TestRetryDispatch:
+    """依錯誤類型選擇重試起點"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error_type", ["sync", "unknown"])
+    async def test_dispatch_by_error_type(self, error_type):
+        scheduler = RetryScheduler()
+        task = FailedTask(
+            instagram_url="https://instagram.com/reel/ABC",
+            telegram_chat_id="1",
+            error_type=error_type,
+            retry_count=0,
+        )
+
+        with patch.object(
+            scheduler, "_retry_full_process", AsyncMock(return_value=True)
+        ) as full_process:
+            await scheduler._retry_single_task(None, task)
+
+        full_process.assert_awaited_once_with(task)
+        assert task.status == "success"
+
+
+class TestNotifyAbandoned:
+    """放棄任務通知"""
+
+    @pytest.mark.asyncio
+    async def test_message_includes_url_and_error(self):
+        scheduler = RetryScheduler()
+        scheduler.bot = AsyncMock()
+        task = FailedTask(
+            instagram_url="https://instagram.com/reel/ABC",
+            telegram_chat_id="1",
+            error_type="download",
+            error_message="下載逾時",
+        )
+
+        await scheduler._notify_abandoned(task)
+
+        text = scheduler.bot.send_message.await_args.kwargs["text"]
+        assert text.startswith("❌ 處理失敗")
+        assert "🔗 連結：https://instagram.com/reel/ABC\n📝 錯誤：下載逾時" in text
@@ -1,6 +1,14 @@
 """摘要服務測試"""
 
+import subprocess
+from unittest.mock import patch
+
 import pytest
+from app.services.claude_summarizer import (
+    ClaudeCodeSummarizer,
+    _find_claude_cli,
+    check_claude_cli_available,
+)
 from app.services.summarizer import OllamaSummarizer
 
 
@@ -66,3 +74,127 @@ class TestOllamaSummarizer:
 
         assert result.success is True
         assert result.summary == content
+
+
+class TestClaudeCodeSummarizer:
+    """ClaudeCodeSummarizer 回應解析測試"""
+
+    def setup_method(self):
+        """測試前設定"""
+        self.summarizer = ClaudeCodeSummarizer()
+
+    def test_parse_response_all_sections(self):
+        """測試解析含工具與畫面觀察的回應"""
+        content = """【摘要】
+這是**重要**的摘要，
+分成兩行。
+
+【重點】
+• **番茄**工作法
+- 1. 任務清單
+2. 定期休息
+
+【工具與技能】
+* Notion
+
+【畫面觀察】
+· 講者在白板前說明
+"""
+
+        result = self.summarizer._parse_response(content)
+
+        assert result.summary == "這是重要的摘要， 分成兩行。"
+        assert result.bullet_points == ["番茄工作法", "任務清單", "定期休息"]
+        assert result.tools_and_skills == ["Notion"]
+        assert result.visual_observations == ["講者在白板前說明"]
+
+    def test_parse_response_fallback(self):
+        """測試無法解析時的備用方案"""
+        content = "這只是一段純文字，沒有格式。"
+
+        result = self.summarizer._parse_response(content)
+
+        assert result.summary == content
+        assert result.tools_and_skills is None
+
+    def test_parse_response_bold_headers(self):
+        """測試以粗體包住的區塊標題"""
+        content = """**【摘要】**
+內容提到【原子習慣】這本書。
+
+**重點】**
+- 重點一"""
+
+        result = self.summarizer._parse_response(content)
+
+        assert result.summary == "內容提到【原子習慣】這本書。"
+        assert result.bullet_points == ["重點一"]
+
+    def test_extract_summary_for_telegram(self):
+        """測試從 Markdown 筆記提取摘要與重點"""
+        markdown = """## 來源資訊
+- 連結：https://instagram.com/reel/ABC
+
+## 摘要
+第一句。
+第二句。
+
+## 重點整理
+- 重點一
+- 重點二
+
+## 工具
+- 不應列入
+"""
+
+        summary, bullet_points = self.summarizer._extract_summary_for_telegram(markdown)
+
+        assert summary == "第一句。 第二句。"
+        assert bullet_points == ["重點一", "重點二"]
+
+
+class TestClaudeCodeRunCli:
+    """ClaudeCodeSummarizer 執行 CLI 測試"""
+
+    def setup_method(self):
+        """測試前設定"""
+        self.summarizer = ClaudeCodeSummarizer()
+        self.summarizer.claude_path = "/usr/bin/claude"
+
+    @pytest.mark.asyncio
+    async def test_prompt_sent_via_stdin(self):
+        completed = subprocess.CompletedProcess([], 0, stdout="  回應內容\n", stderr="")
+        with patch("subprocess.run", return_value=completed) as run_mock:
+            result = await self.summarizer._run_claude_cli("使用者提示", "系統提示")
+
+        assert result == "回應內容"
+        assert run_mock.call_args.kwargs["input"] == "系統提示\n\n---\n\n使用者提示"
+        assert run_mock.call_args.args[0][0] == "/usr/bin/claude"
+
+    @pytest.mark.asyncio
+    async def test_non_zero_exit_raises(self):
+        completed = subprocess.CompletedProcess([], 1, stdout="", stderr="boom")
+        with patch("subprocess.run", return_value=completed):
+            with pytest.raises(RuntimeError, match="Claude CLI 錯誤: boom"):
+                await self.summarizer._run_claude_cli("提示")
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises(self):
+        with patch("subprocess.run", side_effect=subprocess.TimeoutExpired("claude", 120)):
+            with pytest.raises(RuntimeError, match="超時"):
+                await self.summarizer._run_claude_cli("提示")
+
+
+class TestFindClaudeCli:
+    """Claude CLI 路徑偵測"""
+
+    def test_probe_result_is_cached(self):
+        _find_claude_cli.cache_clear()
+        try:
+            with patch("shutil.which", return_value="/usr/bin/claude") as which:
+                assert check_claude_cli_available() is True
+                assert ClaudeCodeSummarizer().claude_path == "/usr/bin/claude"
+
+            which.assert_called_once_with("claude")
+        finally:
+            _find_claude_cli.cache_clear()
@@ -0,0 +1,578 @@
+"""Telegram Bot 處理器測試"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.bot import telegram_handler as handler_module
+from app.bot.telegram_handler import _SINGLE_FLIGHT_FAILED_MESSAGE, TelegramBotHandler
+from app.database.models import ErrorType
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    """在暫存目錄建立 handler，避免服務初始化時在專案目錄建立資料夾"""
+    monkeypatch.chdir(tmp_path)
+    return TelegramBotHandler()
+
+
+class TestExtractUrl:
+    """連結擷取"""
+
+    def test_extract_reel(self, handler):
+        text = "看這個 https://www.instagram.com/reel/ABC_1-x/?igsh=abc 很有趣"
+        assert handler._extract_url(text) == ("instagram", "https://www.instagram.com/reel/ABC_1-x")
+
+    def test_extract_post_no_www(self, handler):
+        text = "https://instagram.com/p/XYZ789"
+        assert handler._extract_url(text) == ("instagram", "https://instagram.com/p/XYZ789")
+
+    def test_extract_reels(self, handler):
+        text = "https://www.instagram.com/reels/ABC123"
+        assert handler._extract_url(text) == ("instagram", "https://www.instagram.com/reels/ABC123")
+
+    def test_extract_none(self, handler):
+        assert handler._extract_url("今天天氣不錯") == (None, None)
+
+    def test_extract_skips_regex_without_domain(self, handler, monkeypatch):
+        class _FailPattern:
+            def finditer(self, text):
+                raise AssertionError("不應執行正則")
+
+        monkeypatch.setattr(handler, "URL_PATTERN", _FailPattern())
+        assert handler._extract_url("https://example.com/reel/ABC") == (None, None)
+
+    def test_threads_takes_priority(self, handler, monkeypatch):
+        monkeypatch.setattr(handler_module.settings, "threads_enabled", True)
+        text = "https://instagram.com/p/XYZ789 https://www.threads.net/@user.name/post/C1d2"
+        assert handler._extract_url(text) == (
+            "threads", "https://www.threads.net/@user.name/post/C1d2"
+        )
+
+    def test_threads_ignored_when_disabled(self, handler, monkeypatch):
+        monkeypatch.setattr(handler_module.settings, "threads_enabled", False)
+        assert handler._extract_url("https://threads.com/t/C1d2") == (None, None)
+        text = "https://threads.com/t/C1d2 https://instagram.com/p/XYZ789"
+        assert handler._extract_url(text) == ("instagram", "https://instagram.com/p/XYZ789")
+
+
+def _make_update(message_id: int, text: str = "", chat_id: int = 1):
+    """建立最小的假 Update 物件"""
+    message = SimpleNamespace(
+        message_id=message_id,
+        chat_id=chat_id,
+        from_user=None,
+        reply_to_message=None,
+        text=text,
+    )
+    return SimpleNamespace(
+        message=message,
+        effective_chat=SimpleNamespace(id=chat_id),
+    )
+
+
+class TestProcessedMessageIds:
+    """訊息防重複處理"""
+
+    @pytest.mark.asyncio
+    async def test_evicts_oldest_ids(self, handler):
+        for message_id in range(1, 1002):
+            await handler.handle_message(_make_update(message_id, text="hi"), None)
+
+        ids = handler._processed_message_ids
+        assert len(ids) == handler.MAX_PROCESSED_MESSAGE_IDS
+        assert (1, 1) not in ids
+        assert (1, 2) in ids
+        assert (1, 1001) in ids
+
+    @pytest.mark.asyncio
+    async def test_filtered_messages_are_not_recorded(self, handler):
+        await handler.handle_message(_make_update(1), None)
+        reply = _make_update(2, text="hi")
+        reply.message.reply_to_message = SimpleNamespace()
+        await handler.handle_message(reply, None)
+
+        assert not handler._processed_message_ids
+
+    @pytest.mark.asyncio
+    async def test_duplicate_message_is_ignored(self, handler):
+        await handler.handle_message(_make_update(1, text="hi"), None)
+        handler._is_authorized = lambda chat_id: pytest.fail("重複訊息不應再處理")
+        await handler.handle_message(_make_update(1, text="hi"), None)
+
+    @pytest.mark.asyncio
+    async def test_same_message_id_in_other_chat_is_processed(self, handler):
+        await handler.handle_message(_make_update(1, text="hi", chat_id=1), None)
+        seen = []
+        handler._is_authorized = lambda chat_id: seen.append(chat_id) or False
+        update = _make_update(1, text="hi", chat_id=2)
+
+        async def reply_text(text):
+            pass
+
+        update.message.reply_text = reply_text
+        await handler.handle_message(update, None)
+
+        assert seen == ["2"]
+
+
+class TestHandleReel:
+    """Reel 處理流程"""
+
+    @pytest.mark.asyncio
+    async def test_transcribe_and_visual_run_concurrently(self, handler, tmp_path):
+        audio_path = tmp_path / "a.mp3"
+        video_path = tmp_path / "v.mp4"
+        audio_path.write_bytes(b"a")
+        video_path.write_bytes(b"v")
+
+        handler.downloader.download = AsyncMock(return_value=SimpleNamespace(
+            success=True,
+            audio_path=audio_path,
+            video_path=video_path,
+            title="標題",
+            caption=None,
+            video_size_bytes=1,
+            audio_size_bytes=1,
+        ))
+        handler.download_logger.log_reel_download = lambda **kwargs: None
+        handler._save_failed_task = AsyncMock()
+
+        transcribe_started = asyncio.Event()
+        visual_started = asyncio.Event()
+
+        async def fake_transcribe(path):
+            transcribe_started.set()
+            await asyncio.wait_for(visual_started.wait(), timeout=1)
+            return SimpleNamespace(success=True, transcript="逐字稿", language="zh")
+
+        async def fake_analyze(path):
+            visual_started.set()
+            await asyncio.wait_for(transcribe_started.wait(), timeout=1)
+            return SimpleNamespace(
+                success=True, overall_visual_summary="畫面", frame_descriptions=[]
+            )
+
+        handler.transcriber.transcribe = fake_transcribe
+        handler.visual_analyzer.analyze = fake_analyze
+        handler.summarizer.generate_note = AsyncMock(
+            return_value=SimpleNamespace(success=False, error_message="boom")
+        )
+
+        await handler._handle_reel("https://instagram.com/reel/ABC", "1", None)
+        await handler.shutdown()
+
+        kwargs = handler.summarizer.generate_note.call_args.kwargs
+        assert kwargs["transcript"] == "逐字稿"
+        assert kwargs["visual_description"] == "畫面"
+        # 暫存檔於背景清理
+        assert not audio_path.exists()
+        assert not video_path.exists()
+
+
+    @pytest.mark.asyncio
+    async def test_transcribe_error_uses_error_path(self, handler, tmp_path):
+        audio_path = tmp_path / "a.mp3"
+        video_path = tmp_path / "v.mp4"
+        audio_path.write_bytes(b"a")
+        video_path.write_bytes(b"v")
+
+        handler.downloader.download = AsyncMock(return_value=SimpleNamespace(
+            success=True,
+            audio_path=audio_path,
+            video_path=video_path,
+            title="標題",
+            caption="說明",
+            video_size_bytes=1,
+            audio_size_bytes=1,
+        ))
+        handler.download_logger.log_reel_download = lambda **kwargs: None
+        handler.transcriber.transcribe = AsyncMock(side_effect=RuntimeError("whisper boom"))
+        visual_done = asyncio.Event()
+
+        async def fake_analyze(path):
+            await asyncio.sleep(0)
+            visual_done.set()
+            return SimpleNamespace(
+                success=True, overall_visual_summary="畫面", frame_descriptions=[]
+            )
+
+        handler.visual_analyzer.analyze = fake_analyze
+        handler.summarizer.generate_note = AsyncMock()
+        edits = []
+
+        async def fake_edit(message, text):
+            edits.append(text)
+
+        handler._safe_edit_message = fake_edit
+
+        assert await handler._handle_reel("https://instagram.com/reel/ABC", "1", None) is False
+        await handler.shutdown()
+
+        assert visual_done.is_set()
+        handler.summarizer.generate_note.assert_not_called()
+        assert edits[-1].startswith("❌ 處理過程發生錯誤")
+        assert "whisper boom" in edits[-1]
+
+class TestSaveProcessedUrlSafely:
+    """記錄已處理 URL 失敗不影響回覆"""
+
+    @pytest.mark.asyncio
+    async def test_database_error_is_swallowed(self, handler, monkeypatch):
+        async def fail_save(**kwargs):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(handler_module, "save_processed_url", fail_save)
+
+        await handler._save_processed_url_safely(
+            url="https://instagram.com/reel/A", url_type="instagram_reel", chat_id="1"
+        )
+
+
+class TestThreadsMedia:
+    """Threads 媒體分析"""
+
+    @pytest.mark.asyncio
+    async def test_videos_analyzed_concurrently_in_order(self, handler):
+        handler.THREADS_VIDEO_CONCURRENCY = 2
+        running = 0
+        max_running = 0
+
+        async def fake_analyze(path):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return SimpleNamespace(success=path != "bad", overall_visual_summary=f"畫面 {path}")
+
+        handler.visual_analyzer.analyze = fake_analyze
+
+        parts = await handler._analyze_threads_videos(["a", "bad", "c"])
+
+        assert parts == ["【影片 1 內容】\n畫面 a", "【影片 3 內容】\n畫面 c"]
+        assert max_running == 2
+
+
+class _FakeSession:
+    """記錄 add_all / commit / execute 呼叫的假 AsyncSession"""
+
+    def __init__(self, log: list, scalar=None):
+        self._log = log
+        self._scalar = scalar
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add_all(self, items):
+        self._log.append(list(items))
+
+    async def commit(self):
+        pass
+
+    async def execute(self, statement):
+        self._log.append(statement)
+        return SimpleNamespace(scalar=lambda: self._scalar)
+
+
+class TestSaveFailedTask:
+    """失敗任務背景批次寫入"""
+
+    @pytest.mark.asyncio
+    async def test_batches_queued_tasks_into_one_commit(self, handler, monkeypatch):
+        batches = []
+        monkeypatch.setattr(handler_module, "AsyncSessionLocal", lambda: _FakeSession(batches))
+
+        for i in range(3):
+            await handler._save_failed_task(f"https://instagram.com/reel/{i}", "1", ErrorType.DOWNLOAD, "err")
+        await handler.shutdown()
+
+        assert len(batches) == 1
+        assert [t.instagram_url for t in batches[0]] == [
+            f"https://instagram.com/reel/{i}" for i in range(3)
+        ]
+        assert batches[0][0].error_type == "download"
+
+    @pytest.mark.asyncio
+    async def test_tasks_within_flush_interval_share_commit(self, handler, monkeypatch):
+        batches = []
+        monkeypatch.setattr(handler_module, "AsyncSessionLocal", lambda: _FakeSession(batches))
+
+        await handler._save_failed_task("https://instagram.com/reel/a", "1", ErrorType.DOWNLOAD, "err")
+        await asyncio.sleep(0)
+        await handler._save_failed_task("https://instagram.com/reel/b", "1", ErrorType.SYNC, "err")
+        await handler.shutdown()
+
+        assert len(batches) == 1
+        assert len(batches[0]) == 2
+
+
+class TestIsAuthorized:
+    """chat_id 白名單"""
+
+    def test_allow_all_when_not_configured(self, handler, monkeypatch):
+        monkeypatch.setitem(handler_module.settings.__dict__, "allowed_chat_id_set", frozenset())
+        assert handler._is_authorized("123") is True
+
+    def test_whitelist(self, handler, monkeypatch):
+        monkeypatch.setitem(
+            handler_module.settings.__dict__, "allowed_chat_id_set", frozenset({"123", "456"})
+        )
+        assert handler._is_authorized("456") is True
+        assert handler._is_authorized("789") is False
+
+    def test_settings_parse_chat_id_set(self):
+        from app.config import Settings
+
+        parsed = Settings(
+            telegram_bot_token="x",
+            roam_graph_name="x",
+            telegram_allowed_chat_ids=" 123, 456,,",
+        )
+        assert parsed.allowed_chat_ids == ["123", "456"]
+        assert parsed.allowed_chat_ids is parsed.allowed_chat_ids
+        assert parsed.allowed_chat_id_set == frozenset({"123", "456"})
+
+
+class TestPendingCount:
+    """/status 待重試數量快取"""
+
+    @pytest.mark.asyncio
+    async def test_count_is_cached(self, handler, monkeypatch):
+        queries = []
+        monkeypatch.setattr(
+            handler_module, "AsyncSessionLocal", lambda: _FakeSession(queries, scalar=7)
+        )
+
+        assert await handler._get_pending_count() == 7
+        assert await handler._get_pending_count() == 7
+        assert len(queries) == 1
+
+        handler._status_cache = None
+        assert await handler._get_pending_count() == 7
+        assert len(queries) == 2
+
+
+class TestStatusCommand:
+    """/status 回覆內容"""
+
+    @pytest.mark.asyncio
+    async def test_status_message(self, handler, monkeypatch):
+        handler._get_pending_count = AsyncMock(return_value=3)
+        monkeypatch.setattr(handler_module.settings, "retry_interval_hours", 2)
+        monkeypatch.setattr(handler_module.settings, "max_retry_count", 5)
+        replies = []
+
+        async def reply_text(text):
+            replies.append(text)
+
+        update = SimpleNamespace(
+            effective_chat=SimpleNamespace(id=1),
+            message=SimpleNamespace(reply_text=reply_text),
+        )
+        await handler.status_command(update, None)
+
+        assert replies == [
+            "📊 系統狀態\n\n✅ Bot 運作正常\n⏳ 待重試任務：3 個\n"
+            "⏰ 重試間隔：每 2 小時\n🔄 最大重試次數：5 次"
+        ]
+
+
+class TestSafeEditMessage:
+    """進度訊息更新節流"""
+
+    @pytest.mark.asyncio
+    async def test_final_edits_are_not_delayed(self, handler, monkeypatch):
+        async def fail_sleep(delay):
+            pytest.fail("最終回覆不應等待")
+
+        monkeypatch.setattr(handler_module.asyncio, "sleep", fail_sleep)
+        edited = []
+
+        async def edit_text(text):
+            edited.append(text)
+
+        message = SimpleNamespace(chat_id=1, edit_text=edit_text)
+
+        assert await handler._safe_edit_message(message, "一") is True
+        assert await handler._safe_edit_message(message, "二") is True
+        assert edited == ["一", "二"]
+
+    @pytest.mark.asyncio
+    async def test_progress_update_skipped_when_too_frequent(self, handler):
+        edited = []
+
+        async def edit_text(text):
+            edited.append(text)
+
+        message = SimpleNamespace(chat_id=1, edit_text=edit_text)
+
+        assert await handler._update_progress(message, "⏳ 一") is True
+        assert await handler._update_progress(message, "⏳ 二") is False
+        assert await handler._safe_edit_message(message, "✅ 完成") is True
+        assert edited == ["⏳ 一", "✅ 完成"]
+
+    @pytest.mark.asyncio
+    async def test_expired_edit_times_are_pruned(self, handler, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr(handler_module, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+
+        async def edit_text(text):
+            pass
+
+        for chat_id in (1, 2):
+            await handler._safe_edit_message(SimpleNamespace(chat_id=chat_id, edit_text=edit_text), "一")
+        assert list(handler._last_edit_at) == [1, 2]
+
+        clock[0] += handler.EDIT_MIN_INTERVAL
+        await handler._safe_edit_message(SimpleNamespace(chat_id=3, edit_text=edit_text), "二")
+
+        assert list(handler._last_edit_at) == [3]
+
+
+class TestSingleFlight:
+    """同一 URL 並行請求只處理一次"""
+
+    async def _start_leader_and_follower(self, handler, handle):
+        """啟動 leader 與 follower，回傳 (leader task, follower task, follower 收到的文字)"""
+        follower_texts = []
+
+        async def follower_edit(text):
+            follower_texts.append(text)
+
+        async def leader_edit(text):
+            pass
+
+        url = "https://instagram.com/reel/ABC"
+        leader = asyncio.create_task(handler._run_single_flight(
+            url, "1", SimpleNamespace(chat_id=1, edit_text=leader_edit), handle
+        ))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(handler._run_single_flight(
+            url, "2", SimpleNamespace(chat_id=2, edit_text=follower_edit), handle
+        ))
+        await asyncio.sleep(0)
+        return leader, follower, follower_texts
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_run(self, handler):
+        calls = []
+        release = asyncio.Event()
+
+        async def handle(url, chat_id, message):
+            calls.append(chat_id)
+            await release.wait()
+            await handler._safe_edit_message(message, "✅ 完成")
+            return True
+
+        leader, follower, follower_texts = await self._start_leader_and_follower(handler, handle)
+        release.set()
+        await asyncio.gather(leader, follower)
+
+        assert calls == ["1"]
+        assert follower_texts[-1] == "✅ 完成"
+        assert "https://instagram.com/reel/ABC" not in handler._inflight_urls
+
+    @pytest.mark.asyncio
+    async def test_handled_failure_is_not_shared(self, handler):
+        release = asyncio.Event()
+
+        async def handle(url, chat_id, message):
+            await release.wait()
+            await handler._safe_edit_message(message, "❌ 下載失敗\n\n已排入重試佇列。")
+            return False
+
+        leader, follower, follower_texts = await self._start_leader_and_follower(handler, handle)
+        release.set()
+        await asyncio.gather(leader, follower)
+
+        assert follower_texts[-1] == _SINGLE_FLIGHT_FAILED_MESSAGE
+        assert not any("已排入重試佇列" in text for text in follower_texts)
+
+    @pytest.mark.asyncio
+    async def test_leader_error_does_not_leak_progress_text(self, handler):
+        release = asyncio.Event()
+
+        async def handle(url, chat_id, message):
+            await handler._safe_edit_message(message, "⏳ 生成筆記中...")
+            await release.wait()
+            raise RuntimeError("boom")
+
+        leader, follower, follower_texts = await self._start_leader_and_follower(handler, handle)
+        release.set()
+        with pytest.raises(RuntimeError):
+            await leader
+        await follower
+
+        assert follower_texts[-1] == _SINGLE_FLIGHT_FAILED_MESSAGE
+        assert "⏳ 生成筆記中..." not in follower_texts
+
+    @pytest.mark.asyncio
+    async def test_leader_cancelled_notifies_follower(self, handler):
+        async def handle(url, chat_id, message):
+            await handler._safe_edit_message(message, "⏳ 生成筆記中...")
+            await asyncio.Event().wait()
+
+        leader, follower, follower_texts = await self._start_leader_and_follower(handler, handle)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        await follower
+
+        assert follower_texts[-1] == _SINGLE_FLIGHT_FAILED_MESSAGE
+        assert "https://instagram.com/reel/ABC" not in handler._inflight_urls
+
+
+class TestFormatReplySimple:
+    """簡潔版回覆訊息格式"""
+
+    def test_full_reply(self, handler):
+        reply = handler._format_reply_simple(
+            summary="摘要文字",
+            bullet_points=["一", "二"],
+            roam_result=SimpleNamespace(success=True, page_url="roam://p"),
+            instagram_url="https://instagram.com/reel/A",
+            vault_result=SimpleNamespace(success=True, note_name="筆記A"),
+        )
+        assert reply == (
+            "✅ 筆記生成完成！\n\n📝 摘要\n摘要文字\n\n📌 重點\n• 一\n• 二\n\n"
+            "📎 筆記已儲存\nroam://p\n\n📚 知識庫\n筆記A\n\n"
+            "🔗 原始連結\nhttps://instagram.com/reel/A"
+        )
+
+    def test_pending_reply_without_bullets(self, handler):
+        reply = handler._format_reply_simple(
+            summary="摘要文字",
+            bullet_points=[],
+            roam_result=None,
+            instagram_url="https://instagram.com/reel/A",
+        )
+        assert reply == (
+            "✅ 筆記生成完成！\n\n📝 摘要\n摘要文字\n\n📌 重點\n\n\n"
+            "📎 筆記尚未儲存（等待確認）\n\n🔗 原始連結\nhttps://instagram.com/reel/A"
+        )
+
+
+class TestProcessUpdate:
+    """Webhook 更新入列"""
+
+    @pytest.mark.asyncio
+    async def test_update_is_queued_without_processing(self, handler):
+        application = handler.build_application()
+
+        await handler.process_update({"update_id": 42})
+
+        assert application.update_queue.qsize() == 1
+        assert application.update_queue.get_nowait().update_id == 42
+
+    def test_application_has_rate_limiter(self, handler):
+        from telegram.ext import AIORateLimiter
+
+        application = handler.build_application()
+
+        assert isinstance(application.bot.rate_limiter, AIORateLimiter)